@@ -1,38 +1,66 @@
 """
 Approval Agent - Responsible for validating RFPs before submission.
 """
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
 from datetime import datetime
+import logging
+from collections import OrderedDict
+import hashlib
 import re
 
-from config.settings import OPENAI_API_KEY, MODEL_NAME, APPROVAL_SYSTEM_MESSAGE, MAX_BUDGET
+from config.settings import APPROVAL_MODEL, APPROVAL_SYSTEM_MESSAGE, MAX_BUDGET, VALIDATION_CACHE_SIZE
 from models.request import ProcurementRequest
 from models.rfp import RFP, RFPStatus, ApprovalResult
 from api.email_service import EmailService
+from agents.utils import OrjsonOutputParser, create_chat_model
+
+logger = logging.getLogger(__name__)
+
+# Budget amounts like "$50,000" / "$ 50,000" or "50,000 USD" / "50,000 dollars"
+_BUDGET_RE = re.compile(
+    r'\$\s*(?P<dollar>[\d,]+(?:\.\d+)?)|(?P<suffix>[\d,]+(?:\.\d+)?)\s*(?:USD|dollars)',
+    re.IGNORECASE
+)
+
+# Sections every RFP must mention, and a pattern that finds any of them in one pass
+_ESSENTIAL_SECTIONS = {name.lower(): name for name in ("Overview", "Requirements", "Timeline", "Budget")}
+_SECTIONS_RE = re.compile("|".join(_ESSENTIAL_SECTIONS), re.IGNORECASE)
+
+# LLM validation results keyed by a hash of the RFP, least recently used first.
+# Guardrails are not cached and still run on every validation.
+_validation_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
 class ApprovalAgent:
     """Agent for validating RFP documents before sending to suppliers."""
     
     def __init__(self):
-        """Initialize the approval agent with the OpenAI model."""
-        self.llm = ChatOpenAI(api_key=OPENAI_API_KEY, model=MODEL_NAME, temperature=0)
-        self.parser = JsonOutputParser()
+        """Initialize the approval agent with the shared OpenAI chain."""
+        self.llm, self.parser, self.prompt, self.chain = self._build_chain()
         self.email_service = EmailService()
+    
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _build_chain(cls) -> Tuple[ChatOpenAI, OrjsonOutputParser, ChatPromptTemplate, Runnable]:
+        """
+        Build the LLM, parser, prompt template and chain once per process.
         
-        # Create prompt template
-        self.prompt = ChatPromptTemplate.from_messages([
+        Returns:
+            Tuple: The LLM, output parser, prompt template and chain
+        """
+        llm = create_chat_model(APPROVAL_MODEL, temperature=0)
+        parser = OrjsonOutputParser()
+        prompt = ChatPromptTemplate.from_messages([
             ("system", APPROVAL_SYSTEM_MESSAGE),
-            ("user", self._create_prompt_template())
+            ("user", cls._create_prompt_template())
         ])
-        
-        # Create the chain
-        self.chain = self.prompt | self.llm | self.parser
+        return llm, parser, prompt, prompt | llm | parser
     
-    def _create_prompt_template(self) -> str:
+    @staticmethod
+    def _create_prompt_template() -> str:
         """Create the prompt template for RFP validation."""
         return """
         Please validate the following Request for Proposal (RFP) document:
@@ -71,25 +99,21 @@ class ApprovalAgent:
         Returns:
             float: The extracted budget amount or 0 if not found
         """
-        # Look for budget patterns like "$50,000" or "50,000 USD"
-        budget_patterns = [
-            r'\$\s*([\d,]+(?:\.\d+)?)',  # $50,000 or $ 50,000
-            r'([\d,]+(?:\.\d+)?)\s*(?:USD|dollars)',  # 50,000 USD or 50,000 dollars
-            r'budget.*?\$\s*([\d,]+(?:\.\d+)?)',  # Budget: $50,000
-            r'budget.*?([\d,]+(?:\.\d+)?)\s*(?:USD|dollars)'  # Budget: 50,000 USD
-        ]
-        
-        for pattern in budget_patterns:
-            matches = re.findall(pattern, rfp_content, re.IGNORECASE)
-            if matches:
-                # Take the first match and remove commas
-                budget_str = matches[0].replace(',', '')
-                try:
-                    return float(budget_str)
-                except ValueError:
-                    continue
-        
-        return 0.0
+        # Dollar-sign amounts take priority over "USD"/"dollars" amounts, so
+        # remember the first of the latter and only use it if no "$" is found
+        fallback = None
+        for match in _BUDGET_RE.finditer(rfp_content):
+            amount = match.group("dollar") or match.group("suffix")
+            try:
+                value = float(amount.replace(',', ''))
+            except ValueError:
+                continue
+            if match.group("dollar") is not None:
+                return value
+            if fallback is None:
+                fallback = value
+        
+        return fallback if fallback is not None else 0.0
     
     def _apply_guardrails(self, rfp: RFP, approval_result: ApprovalResult) -> ApprovalResult:
         """
@@ -110,10 +134,14 @@ class ApprovalAgent:
             approval_result.approved = False
             issues.append(f"Budget exceeds maximum allowed threshold of ${MAX_BUDGET:,.2f}")
         
-        # Check for missing sections
-        essential_sections = ["Overview", "Requirements", "Timeline", "Budget"]
-        for section in essential_sections:
-            if section.lower() not in rfp.content.lower():
+        # Check for missing sections in a single scan of the content
+        found_sections = set()
+        for match in _SECTIONS_RE.finditer(rfp.content):
+            found_sections.add(match.group(0).lower())
+            if len(found_sections) == len(_ESSENTIAL_SECTIONS):
+                break
+        for key, section in _ESSENTIAL_SECTIONS.items():
+            if key not in found_sections:
                 approval_result.approved = False
                 issues.append(f"Missing essential section: {section}")
         
@@ -135,7 +163,7 @@ class ApprovalAgent:
             ApprovalResult: The result of the validation
         """
         try:
-            print(f"Starting validation of RFP {rfp.id}...")
+            logger.debug("Starting validation of RFP %s", rfp.id)
             
             # Create input data with flattened properties
             input_data = {
@@ -144,44 +172,54 @@ class ApprovalAgent:
                 "content": rfp.content
             }
             
-            # Run the validation chain
-            print("Invoking OpenAI for validation...")
-            try:
+            # Reuse the model's verdict for an identical RFP validated earlier
+            cache_key = hashlib.sha256(f"{rfp.title}|{rfp.category}|{rfp.content}".encode()).hexdigest()
+            verdict = _validation_cache.get(cache_key)
+            if verdict is not None:
+                _validation_cache.move_to_end(cache_key)
+                logger.debug("Reusing cached validation result for RFP %s", rfp.id)
+                approval_result = ApprovalResult(
+                    rfp_id=rfp.id,
+                    approved=verdict["approved"],
+                    feedback=verdict["feedback"],
+                    issues=list(verdict["issues"])
+                )
+            else:
+                # Run the validation chain
+                logger.debug("Invoking OpenAI for validation")
                 result = await self.chain.ainvoke(input_data)
-                print(f"Validation result from OpenAI: {result}")
-            except Exception as api_error:
-                print(f"OpenAI API error: {str(api_error)}")
-                import traceback
-                traceback.print_exc()
-                raise
-            
-            # Create the approval result
-            approval_result = ApprovalResult(
-                rfp_id=rfp.id,
-                approved=result["approved"],
-                feedback=result["feedback"],
-                issues=result.get("issues", [])
-            )
+                logger.debug("Validation result from OpenAI: %s", result)
+                
+                # Create the approval result
+                approval_result = ApprovalResult(
+                    rfp_id=rfp.id,
+                    approved=result["approved"],
+                    feedback=result["feedback"],
+                    issues=list(result.get("issues", []))
+                )
+                
+                # Only cache a response that produced a valid result, and only its
+                # validated fields, so a malformed reply is retried next time
+                _validation_cache[cache_key] = approval_result.model_dump(include={"approved", "feedback", "issues"})
+                if len(_validation_cache) > VALIDATION_CACHE_SIZE:
+                    _validation_cache.popitem(last=False)
             
             # Apply guardrails
-            print("Applying guardrails...")
             approval_result = self._apply_guardrails(rfp, approval_result)
-            print(f"Final approval result after guardrails: {approval_result.approved}")
+            logger.debug("Final approval result after guardrails: %s", approval_result.approved)
             
             # Update the RFP status based on the approval result
             if approval_result.approved:
-                rfp.status = RFPStatus.APPROVED
+                rfp.status = RFPStatus.APPROVED.value
                 rfp.approval_date = datetime.now()
             else:
-                rfp.status = RFPStatus.REJECTED
+                rfp.status = RFPStatus.REJECTED.value
             
             rfp.approval_feedback = approval_result.feedback
             
             return approval_result
-        except Exception as e:
-            print(f"Error in validate_rfp: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error validating RFP %s", rfp.id)
             raise
     
     async def send_to_suppliers(self, rfp: RFP) -> bool:
@@ -194,13 +232,13 @@ class ApprovalAgent:
         Returns:
             bool: Whether the email was sent successfully
         """
-        if rfp.status != RFPStatus.APPROVED:
+        if rfp.status != RFPStatus.APPROVED.value:
             return False
         
         success = await self.email_service.send_rfp(rfp)
         
         if success:
-            rfp.status = RFPStatus.SENT
+            rfp.status = RFPStatus.SENT.value
             rfp.sent_date = datetime.now()
         
         return success
\ No newline at end of file
@@ -1,43 +1,72 @@
 """
 Classification Agent - Responsible for categorizing procurement requests.
 """
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
+import logging
 import uuid
 
-from config.settings import OPENAI_API_KEY, MODEL_NAME, CLASSIFICATION_SYSTEM_MESSAGE, PROCUREMENT_CATEGORIES
+import orjson
+from pydantic import ValidationError
+
+from config.settings import (
+    CLASSIFICATION_MODEL, CLASSIFICATION_SYSTEM_MESSAGE, PROCUREMENT_CATEGORIES,
+    MAX_CONCURRENT_LLM_CALLS, CLASSIFICATION_BATCH_SIZE
+)
 from models.request import ProcurementRequest, ClassificationResult
+from agents.utils import OrjsonOutputParser, create_chat_model, gather_bounded
+
+logger = logging.getLogger(__name__)
+
+# Fields every item of a combined classification response must have
+_COMBINED_FIELDS = frozenset({"index", "category", "confidence", "reasoning"})
 
 class ClassificationAgent:
     """Agent for classifying procurement requests into categories."""
     
     def __init__(self):
-        """Initialize the classification agent with the OpenAI model."""
-        print("Initializing ClassificationAgent...")
-        try:
-            self.llm = ChatOpenAI(api_key=OPENAI_API_KEY, model=MODEL_NAME, temperature=0)
-            print(f"Successfully created LLM using model: {MODEL_NAME}")
-            self.parser = JsonOutputParser()
-            
-            # Create prompt template
-            self.prompt = ChatPromptTemplate.from_messages([
-                ("system", CLASSIFICATION_SYSTEM_MESSAGE),
-                ("user", self._create_prompt_template())
-            ])
-            
-            # Create the chain
-            self.chain = self.prompt | self.llm | self.parser
-            print("Classification agent initialized successfully")
-        except Exception as e:
-            print(f"Error initializing ClassificationAgent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            raise
+        """Initialize the classification agent with the shared OpenAI chain."""
+        self.llm, self.parser, self.prompt, self.chain = self._build_chain()
+    
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _build_chain(cls) -> Tuple[ChatOpenAI, OrjsonOutputParser, ChatPromptTemplate, Runnable]:
+        """
+        Build the LLM, parser, prompt template and chain once per process.
+        
+        Returns:
+            Tuple: The LLM, output parser, prompt template and chain
+        """
+        llm = create_chat_model(CLASSIFICATION_MODEL, temperature=0, cached=True)
+        logger.info("Created classification LLM using model: %s", CLASSIFICATION_MODEL)
+        parser = OrjsonOutputParser()
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", CLASSIFICATION_SYSTEM_MESSAGE),
+            ("user", cls._create_prompt_template())
+        ])
+        return llm, parser, prompt, prompt | llm | parser
     
-    def _create_prompt_template(self) -> str:
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _build_combined_chain(cls) -> Runnable:
+        """
+        Build the chain that classifies several requests in one call, reusing the shared LLM and parser.
+        
+        Returns:
+            Runnable: The combined classification chain
+        """
+        llm, parser, _, _ = cls._build_chain()
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", CLASSIFICATION_SYSTEM_MESSAGE),
+            ("user", cls._create_combined_prompt_template())
+        ])
+        return prompt | llm | parser
+    
+    @staticmethod
+    def _create_prompt_template() -> str:
         """Create the prompt template for classification."""
         categories_str = ", ".join(PROCUREMENT_CATEGORIES)
         return f"""
@@ -57,6 +86,28 @@ class ClassificationAgent:
         JSON RESPONSE:
         """
     
+    @staticmethod
+    def _create_combined_prompt_template() -> str:
+        """Create the prompt template for classifying a JSON array of requests at once."""
+        categories_str = ", ".join(PROCUREMENT_CATEGORIES)
+        return f"""
+        Please analyze each of the following procurement requests and classify it into one of these categories: {categories_str}.
+        
+        The requests are given as a JSON array. Each request has an "index", a "title", a "description" and "additional_notes".
+        
+        REQUESTS: {{requests}}
+        
+        Provide your response as a JSON array with exactly one object per request, each with the following fields:
+        - index: The index of the request being classified
+        - category: The selected category
+        - confidence: A numerical score between 0 and 1 indicating your confidence in the classification
+        - reasoning: A brief explanation of why you selected this category
+        
+        Note : if a request does not fit any of the above categories, please assign a new category to the request based on its contents.
+        
+        JSON RESPONSE:
+        """
+    
     async def classify(self, request: ProcurementRequest) -> ClassificationResult:
         """
         Classify a procurement request into a specific category.
@@ -68,31 +119,24 @@ class ClassificationAgent:
             ClassificationResult: The classification result
         """
         try:
-            print(f"Starting classification for request: {request.title}")
+            logger.debug("Starting classification for request: %s", request.title)
             
             # Ensure request has an ID
             if not request.id:
                 request.id = str(uuid.uuid4())
-                print(f"Generated new ID for request: {request.id}")
+                logger.debug("Generated new ID for request: %s", request.id)
             
-            # Create the input data for the template
             # Create the input data for the template
             input_data = {
                 "title": request.title,
                 "description": request.description,
                 "additional_notes": request.additional_notes or "None"
-}
+            }
             
             # Run the classification chain
-            print("Invoking OpenAI API for classification...")
-            try:
-                result = await self.chain.ainvoke(input_data)
-                print(f"Classification API result: {result}")
-            except Exception as api_error:
-                print(f"OpenAI API error: {str(api_error)}")
-                import traceback
-                traceback.print_exc()
-                raise
+            logger.debug("Invoking OpenAI API for classification")
+            result = await self.chain.ainvoke(input_data)
+            logger.debug("Classification API result: %s", result)
             
             # Create and return the classification result
             classification = ClassificationResult(
@@ -101,10 +145,148 @@ class ClassificationAgent:
                 confidence=result["confidence"],
                 reasoning=result["reasoning"]
             )
-            print(f"Created classification result: {classification.category}")
+            logger.debug("Created classification result: %s", classification.category)
             return classification
-        except Exception as e:
-            print(f"Error in classification agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            raise
\ No newline at end of file
+        except Exception:
+            logger.exception("Error classifying request %s", request.id)
+            raise
+    
+    async def classify_batch(
+        self,
+        requests: List[ProcurementRequest],
+        max_concurrent: int = MAX_CONCURRENT_LLM_CALLS
+    ) -> List[ClassificationResult]:
+        """
+        Classify many procurement requests concurrently.
+        
+        Args:
+            requests: The procurement requests to classify
+            max_concurrent: Maximum number of classification calls in flight at once
+            
+        Returns:
+            List[ClassificationResult]: The classification results, in input order
+        """
+        return await gather_bounded(self.classify, requests, max_concurrent)
+    
+    async def classify_combined(
+        self,
+        requests: List[ProcurementRequest],
+        batch_size: int = CLASSIFICATION_BATCH_SIZE,
+        max_concurrent: int = MAX_CONCURRENT_LLM_CALLS
+    ) -> List[ClassificationResult]:
+        """
+        Classify many procurement requests with one LLM call per batch of requests.
+        
+        Unlike classify_batch, which makes one call per request, this sends up to
+        batch_size requests in a single prompt so the instructions are only paid for
+        once per batch. Any request missing from a batch response, given an
+        invalid classification, or in a batch whose call failed is classified
+        on its own.
+        
+        Args:
+            requests: The procurement requests to classify
+            batch_size: Maximum number of requests per combined prompt
+            max_concurrent: Maximum number of combined calls in flight at once
+            
+        Returns:
+            List[ClassificationResult]: The classification results, in input order
+        """
+        for request in requests:
+            if not request.id:
+                request.id = str(uuid.uuid4())
+        
+        batches = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+        results = await gather_bounded(self._classify_combined_batch, batches, max_concurrent)
+        return [classification for batch in results for classification in batch]
+    
+    async def _classify_combined_batch(self, requests: List[ProcurementRequest]) -> List[ClassificationResult]:
+        """
+        Classify one batch of requests with a single combined prompt.
+        
+        Args:
+            requests: The procurement requests in this batch
+            
+        Returns:
+            List[ClassificationResult]: The classification results, in input order
+        """
+        input_data = {
+            "requests": orjson.dumps([
+                {
+                    "index": index,
+                    "title": request.title,
+                    "description": request.description,
+                    "additional_notes": request.additional_notes or "None"
+                }
+                for index, request in enumerate(requests)
+            ]).decode()
+        }
+        
+        # A failed combined call only affects this batch: its requests are
+        # classified individually below, and the other batches are kept
+        try:
+            logger.debug("Invoking OpenAI API for combined classification of %d requests", len(requests))
+            response = await self._build_combined_chain().ainvoke(input_data)
+            by_index = self._index_combined_response(response)
+        except Exception:
+            logger.exception("Error classifying a batch of %d requests", len(requests))
+            by_index = {}
+        
+        classifications: List[Optional[ClassificationResult]] = []
+        for index, request in enumerate(requests):
+            item = by_index.get(index)
+            classification = None
+            if item is not None:
+                try:
+                    classification = ClassificationResult(
+                        request_id=request.id,
+                        category=item["category"],
+                        confidence=item["confidence"],
+                        reasoning=item["reasoning"]
+                    )
+                except ValidationError:
+                    logger.warning("Skipping invalid combined classification item: %s", item)
+            classifications.append(classification)
+        
+        # Classify whatever the combined response left out, concurrently
+        missing = [index for index, classification in enumerate(classifications) if classification is None]
+        if missing:
+            logger.warning(
+                "%d of %d requests missing from combined classification; classifying them individually",
+                len(missing), len(requests)
+            )
+            fallback = await self.classify_batch([requests[index] for index in missing])
+            for index, classification in zip(missing, fallback):
+                classifications[index] = classification
+        return classifications
+    
+    @staticmethod
+    def _index_combined_response(response: Any) -> Dict[int, Dict[str, Any]]:
+        """
+        Index the items of a combined classification response by request position.
+        
+        Accepts a bare JSON array or an array wrapped in a single-key object
+        (e.g. ``{"classifications": [...]}``), and indexes given as strings.
+        Malformed items are skipped.
+        
+        Args:
+            response: The parsed model output
+            
+        Returns:
+            Dict[int, Dict[str, Any]]: The well-formed items, keyed by request index
+        """
+        if isinstance(response, dict) and len(response) == 1:
+            response = next(iter(response.values()))
+        if not isinstance(response, list):
+            logger.warning("Combined classification response is not a list: %.200s", response)
+            return {}
+        
+        by_index = {}
+        for item in response:
+            if isinstance(item, dict) and _COMBINED_FIELDS <= item.keys():
+                try:
+                    by_index[int(item["index"])] = item
+                    continue
+                except (TypeError, ValueError):
+                    pass
+            logger.warning("Skipping malformed combined classification item: %s", item)
+        return by_index
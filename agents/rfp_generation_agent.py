@@ -1,35 +1,54 @@
 """
 RFP Generation Agent - Responsible for creating RFP documents from request information.
 """
-from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from functools import lru_cache
+import logging
 import uuid
+from datetime import datetime
 
-from config.settings import OPENAI_API_KEY, MODEL_NAME, RFP_GENERATION_SYSTEM_MESSAGE, RFP_TEMPLATES
+from config.settings import GENERATION_MODEL, RFP_GENERATION_SYSTEM_MESSAGE, RFP_TEMPLATES
 from models.request import ProcurementRequest, ClassificationResult
 from models.rfp import RFP, RFPStatus
+from agents.utils import OrjsonOutputParser, create_chat_model
+
+logger = logging.getLogger(__name__)
+
+class _BlankDefaultDict(dict):
+    """Dict that formats missing template keys as empty strings."""
+    
+    def __missing__(self, key: str) -> str:
+        return ""
 
 class RFPGenerationAgent:
     """Agent for generating RFP documents based on procurement requests."""
     
     def __init__(self):
-        """Initialize the RFP generation agent with the OpenAI model."""
-        self.llm = ChatOpenAI(api_key=OPENAI_API_KEY, model=MODEL_NAME, temperature=0.2)
-        self.parser = JsonOutputParser()
+        """Initialize the RFP generation agent with the shared OpenAI chain."""
+        self.llm, self.parser, self.prompt, self.chain = self._build_chain()
+    
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _build_chain(cls) -> Tuple[ChatOpenAI, OrjsonOutputParser, ChatPromptTemplate, Runnable]:
+        """
+        Build the LLM, parser, prompt template and chain once per process.
         
-        # Create prompt template
-        self.prompt = ChatPromptTemplate.from_messages([
+        Returns:
+            Tuple: The LLM, output parser, prompt template and chain
+        """
+        llm = create_chat_model(GENERATION_MODEL, temperature=0.2, cached=True)
+        parser = OrjsonOutputParser()
+        prompt = ChatPromptTemplate.from_messages([
             ("system", RFP_GENERATION_SYSTEM_MESSAGE),
-            ("user", self._create_prompt_template())
+            ("user", cls._create_prompt_template())
         ])
-        
-        # Create the chain
-        self.chain = self.prompt | self.llm | self.parser
+        return llm, parser, prompt, prompt | llm | parser
     
-    def _create_prompt_template(self) -> str:
+    @staticmethod
+    def _create_prompt_template() -> str:
         """Create the prompt template for RFP generation."""
         return """
         Generate a Request for Proposal (RFP) based on the following procurement request information:
@@ -63,13 +82,44 @@ class RFPGenerationAgent:
         JSON RESPONSE:
         """
     
-    async def generate_rfp(self, request: ProcurementRequest, classification: ClassificationResult) -> RFP:
+    @staticmethod
+    def build_context(request: ProcurementRequest) -> Dict[str, Any]:
+        """
+        Build the category-independent prompt inputs for a request's RFP.
+        
+        These depend only on the request, so they can be prepared while the
+        request is still being classified.
+        
+        Args:
+            request: The procurement request
+            
+        Returns:
+            Dict[str, Any]: The prompt inputs for everything except the category
+        """
+        return {
+            "title": request.title,
+            "description": request.description,
+            "budget": request.estimated_budget or "Not specified",
+            "timeline": request.timeline or "Not specified",
+            "department": request.department or "Not specified",
+            "requester": request.requester or "Not specified",
+            "required_by_date": request.required_by_date or "Not specified",
+            "additional_notes": request.additional_notes or "Not specified"
+        }
+    
+    async def generate_rfp(
+        self,
+        request: ProcurementRequest,
+        classification: ClassificationResult,
+        context: Optional[Dict[str, Any]] = None
+    ) -> RFP:
         """
         Generate an RFP document based on a classified procurement request.
         
         Args:
             request: The procurement request
             classification: The classification result
+            context: Optional prompt inputs prepared earlier by build_context
             
         Returns:
             RFP: The generated RFP document
@@ -77,14 +127,7 @@ class RFPGenerationAgent:
         try:
             # Create input data with flattened properties
             input_data = {
-                "title": request.title,
-                "description": request.description,
-                "budget": request.estimated_budget or "Not specified",
-                "timeline": request.timeline or "Not specified",
-                "department": request.department or "Not specified",
-                "requester": request.requester or "Not specified",
-                "required_by_date": request.required_by_date or "Not specified",
-                "additional_notes": request.additional_notes or "Not specified",
+                **(context or self.build_context(request)),
                 "category": classification.category
             }
             
@@ -94,29 +137,23 @@ class RFPGenerationAgent:
             # Get the appropriate template for the category
             template = RFP_TEMPLATES.get(classification.category, RFP_TEMPLATES["Services"])
             
-            # Format the template with the extracted information
-            # Add empty string defaults for any missing keys
-            for key in [
-                "project_overview", "requirements", "timeline", "budget", 
-                "evaluation_criteria", "submission_instructions", "quantity", 
-                "warranty", "sla", "quality"
-            ]:
-                if key not in rfp_content_json:
-                    rfp_content_json[key] = ""
-            
-            formatted_content = template.format(**rfp_content_json)
+            # Format the template with the extracted information,
+            # leaving any section the model did not return empty
+            formatted_content = template.format_map(_BlankDefaultDict(rfp_content_json))
             
-            # Create and return the RFP
-            return RFP(
+            # Create and return the RFP; every field comes from already-validated
+            # models or is built here, so skip re-validation
+            now = datetime.now()
+            return RFP.model_construct(
                 id=str(uuid.uuid4()),
                 request_id=request.id,
                 title=f"RFP for {request.title}",
                 category=classification.category,
                 content=formatted_content,
-                status=RFPStatus.PENDING_APPROVAL
+                status=RFPStatus.PENDING_APPROVAL.value,
+                created_at=now,
+                updated_at=now
             )
-        except Exception as e:
-            print(f"Error in generate_rfp: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            raise
\ No newline at end of file
+        except Exception:
+            logger.exception("Error generating RFP for request %s", request.id)
+            raise
@@ -0,0 +1,231 @@
+"""
+Shared helpers for the procurement agents.
+"""
+import asyncio
+import re
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union
+
+import httpx
+import orjson
+from langchain_community.cache import SQLiteCache
+from langchain_core.caches import BaseCache
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import Generation
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_openai import ChatOpenAI
+
+from config.settings import (
+    OPENAI_API_KEY, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY,
+    OPENAI_REQUESTS_PER_MINUTE, OPENAI_MAX_RETRIES, MAX_CONCURRENT_LLM_CALLS, LLM_CACHE_PATH
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A whole response wrapped in a ```json ... ``` code fence
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*(.*?)\s*```$', re.DOTALL)
+
+
+class OrjsonOutputParser(JsonOutputParser):
+    """
+    JSON output parser that decodes complete responses with orjson.
+    
+    Partial (streamed) output and anything orjson rejects fall back to
+    the standard LangChain parser, which is more lenient.
+    """
+    
+    def parse_result(self, result: List[Generation], *, partial: bool = False) -> Any:
+        if not partial:
+            text = result[0].text.strip()
+            match = _JSON_FENCE_RE.match(text)
+            if match:
+                text = match.group(1)
+            try:
+                return orjson.loads(text)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse_result(result, partial=partial)
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    HTTP transport that keeps a separate connection pool for each event loop.
+    
+    Pooled connections belong to the loop that opened them, so a single pool
+    breaks as soon as a second loop (e.g. a second ``asyncio.run``) reuses a
+    keep-alive connection from a loop that has since closed.
+    
+    A pool holds its loop alive through its connections, so it is released
+    explicitly: it is closed when its loop shuts down its async generators
+    (``asyncio.run`` does this before closing the loop), and pools of loops
+    that have been closed are dropped on the next request.
+    """
+    
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._transports: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncHTTPTransport, AsyncGenerator[None, None]]] = {}
+    
+    async def _transport(self) -> httpx.AsyncHTTPTransport:
+        """Get the connection pool for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        entry = self._transports.get(loop)
+        if entry is not None:
+            return entry[0]
+        
+        for other in [other for other in self._transports if other.is_closed()]:
+            del self._transports[other]
+        
+        transport = httpx.AsyncHTTPTransport(limits=self._limits)
+        # Started here, the generator is registered with this loop, which closes it
+        # (running its finally block) while shutting down
+        closer = self._close_at_shutdown(loop, transport)
+        await closer.__anext__()
+        self._transports[loop] = (transport, closer)
+        return transport
+    
+    async def _close_at_shutdown(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        transport: httpx.AsyncHTTPTransport
+    ) -> AsyncGenerator[None, None]:
+        """Park until the loop shuts down its async generators, then close the loop's pool."""
+        try:
+            yield
+        finally:
+            if self._transports.get(loop, (None,))[0] is transport:
+                del self._transports[loop]
+            await transport.aclose()
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = await self._transport()
+        return await transport.handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        # Only the running loop's pool can be closed from here; the others
+        # are closed when their loops shut down
+        entry = self._transports.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+
+@lru_cache(maxsize=1)
+def get_shared_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client used for all async OpenAI calls.
+    
+    Sharing one client lets every agent reuse the same pool of
+    keep-alive connections instead of each opening its own. The pool is
+    kept per event loop, so the client stays usable across separate
+    ``asyncio.run`` calls.
+    
+    Returns:
+        httpx.AsyncClient: The shared HTTP client
+    """
+    return httpx.AsyncClient(
+        transport=_PerLoopTransport(
+            httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            )
+        )
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shared_rate_limiter() -> InMemoryRateLimiter:
+    """
+    Get the process-wide rate limiter applied to every agent's OpenAI calls.
+    
+    The limiter is shared so that concurrent batches across all agents stay
+    under one request budget, instead of each agent bursting independently.
+    
+    Returns:
+        InMemoryRateLimiter: The shared rate limiter
+    """
+    return InMemoryRateLimiter(
+        requests_per_second=OPENAI_REQUESTS_PER_MINUTE / 60,
+        check_every_n_seconds=0.05,
+        max_bucket_size=MAX_CONCURRENT_LLM_CALLS
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shared_llm_cache() -> Optional[BaseCache]:
+    """
+    Get the process-wide on-disk LLM response cache.
+    
+    Identical prompts sent to the same model with the same parameters are
+    answered from the cache instead of calling OpenAI again.
+    
+    Returns:
+        Optional[BaseCache]: The shared cache, or None if LLM_CACHE_PATH is empty
+    """
+    if not LLM_CACHE_PATH:
+        return None
+    return SQLiteCache(database_path=LLM_CACHE_PATH)
+
+
+def create_chat_model(model: str, temperature: float, cached: bool = False) -> ChatOpenAI:
+    """
+    Create a chat model wired to the shared HTTP client and rate limiter.
+    
+    Args:
+        model: The OpenAI model name
+        temperature: The sampling temperature
+        cached: Whether to answer repeated prompts from the shared LLM cache
+        
+    Returns:
+        ChatOpenAI: The configured chat model
+    """
+    # cache=False rather than None, so a globally set LLM cache is not picked up either
+    cache = (get_shared_llm_cache() or False) if cached else False
+    return ChatOpenAI(
+        api_key=OPENAI_API_KEY,
+        model=model,
+        temperature=temperature,
+        max_retries=OPENAI_MAX_RETRIES,
+        rate_limiter=get_shared_rate_limiter(),
+        http_async_client=get_shared_async_http_client(),
+        cache=cache
+    )
+
+
+async def gather_bounded(
+    func: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    max_concurrent: int,
+    return_exceptions: bool = False
+) -> List[Union[R, BaseException]]:
+    """
+    Run an async function over many items concurrently with a concurrency cap.
+    
+    If a call fails and exceptions are not returned, the calls still running
+    or waiting for a slot are cancelled before the exception is raised, so no
+    work is left running unobserved.
+
+    Args:
+        func: The coroutine function to apply to each item
+        items: The items to process
+        max_concurrent: Maximum number of calls in flight at once
+        return_exceptions: Whether to return each failed call's exception in its
+            result slot instead of raising the first one
+
+    Returns:
+        List: The results, in the same order as the input items
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -6,12 +6,10 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 import asyncio
-from fpdf import FPDF
-import io
 
-from config.settings import EMAIL_HOST, EMAIL_PORT, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM
+from config.settings import EMAIL_HOST, EMAIL_PORT, EMAIL_USERNAME, EMAIL_PASSWORD, EMAIL_FROM, EMAIL_MAX_CONNECTIONS
 from models.rfp import RFP, Supplier
 
 logger = logging.getLogger(__name__)
@@ -29,48 +27,9 @@ class EmailService:
         Returns:
             bytes: The generated PDF as bytes
         """
-        # Create PDF object
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Add title
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, rfp.title, 0, 1, "C")
-        pdf.ln(5)
-        
-        # Add category
-        pdf.set_font("Arial", "B", 12)
-        pdf.cell(0, 10, f"Category: {rfp.category}", 0, 1)
-        pdf.ln(5)
-        
-        # Add RFP content
-        pdf.set_font("Arial", "", 11)
-        
-        # Split content by lines and add each line
-        lines = rfp.content.split("\n")
-        for line in lines:
-            # Check if line is a heading (starts with #)
-            if line.strip().startswith("#"):
-                # Count the level of heading
-                heading_level = len(line.split(" ")[0].strip("#"))
-                heading_text = " ".join(line.split(" ")[1:])
-                
-                if heading_level == 1:
-                    pdf.set_font("Arial", "B", 14)
-                elif heading_level == 2:
-                    pdf.set_font("Arial", "B", 12)
-                else:
-                    pdf.set_font("Arial", "B", 11)
-                    
-                pdf.cell(0, 10, heading_text, 0, 1)
-                pdf.set_font("Arial", "", 11)
-            else:
-                # Regular text
-                if line.strip():  # Skip empty lines
-                    pdf.multi_cell(0, 5, line)
-        
-        # Return PDF as bytes
-        return pdf.output(dest="S").encode("latin1")
+        # Imported here so ReportLab is only loaded once an RFP is actually sent
+        from api.pdf_service import render_rfp_pdf
+        return render_rfp_pdf(rfp.title, rfp.content, category=rfp.category)
     
     async def send_rfp(self, rfp: RFP) -> bool:
         """
@@ -86,31 +45,50 @@ class EmailService:
             logger.warning(f"No suppliers specified for RFP {rfp.id}")
             return False
         
+        # The PDF is identical for every supplier, so render it only once
+        try:
+            pdf_bytes = self._generate_rfp_pdf(rfp)
+        except Exception as e:
+            logger.error(f"Error generating PDF: {str(e)}")
+            pdf_bytes = None
+        
+        # Build every supplier's message up front so they can share one SMTP session
+        messages = []
         success = True
         for supplier in rfp.suppliers:
             try:
-                # Create the email message
-                msg = self._create_email_message(rfp, supplier)
-                
-                # Send the email
-                if await self._send_email(msg, supplier.email):
-                    logger.info(f"Successfully sent RFP {rfp.id} to {supplier.email}")
-                else:
-                    logger.error(f"Failed to send RFP {rfp.id} to {supplier.email}")
-                    success = False
+                messages.append((self._create_email_message(rfp, supplier, pdf_bytes), supplier.email))
             except Exception as e:
-                logger.error(f"Error sending RFP to {supplier.email}: {str(e)}")
+                logger.error(f"Error creating RFP email for {supplier.email}: {str(e)}")
+                success = False
+        
+        # Spread the messages over a few SMTP sessions that send in parallel,
+        # each session reusing its connection for its share of the suppliers
+        connections = max(1, min(EMAIL_MAX_CONNECTIONS, len(messages)))
+        batch_results = await asyncio.gather(*(
+            self._send_emails(messages[i::connections]) for i in range(connections)
+        ))
+        results = [False] * len(messages)
+        for i, sent in enumerate(batch_results):
+            results[i::connections] = sent
+        
+        for (_, recipient), sent in zip(messages, results):
+            if sent:
+                logger.info(f"Successfully sent RFP {rfp.id} to {recipient}")
+            else:
+                logger.error(f"Failed to send RFP {rfp.id} to {recipient}")
                 success = False
         
         return success
     
-    def _create_email_message(self, rfp: RFP, supplier: Supplier) -> MIMEMultipart:
+    def _create_email_message(self, rfp: RFP, supplier: Supplier, pdf_bytes: Optional[bytes]) -> MIMEMultipart:
         """
         Create an email message for a specific supplier.
         
         Args:
             rfp: The RFP to send
             supplier: The supplier to send to
+            pdf_bytes: The rendered RFP PDF, or None to attach the plain-text content instead
             
         Returns:
             MIMEMultipart: The email message
@@ -136,48 +114,47 @@ class EmailService:
         # Attach text part
         msg.attach(MIMEText(text, 'plain'))
         
-        # Generate RFP PDF
-        try:
-            pdf_bytes = self._generate_rfp_pdf(rfp)
-            
+        if pdf_bytes is not None:
             # Attach PDF
             attachment = MIMEApplication(pdf_bytes, _subtype="pdf")
             attachment.add_header('Content-Disposition', 'attachment', filename=f"RFP_{rfp.id}.pdf")
             msg.attach(attachment)
-        except Exception as e:
-            logger.error(f"Error generating PDF: {str(e)}")
-            # If PDF generation fails, fall back to text attachment
+        else:
+            # If PDF generation failed, fall back to text attachment
             text_attachment = MIMEText(rfp.content)
             text_attachment.add_header('Content-Disposition', 'attachment', filename=f"RFP_{rfp.id}.txt")
             msg.attach(text_attachment)
         
         return msg
     
-    async def _send_email(self, msg: MIMEMultipart, recipient: str) -> bool:
+    async def _send_emails(self, messages: List[Tuple[MIMEMultipart, str]]) -> List[bool]:
         """
-        Send an email using SMTP.
+        Send several emails using a single SMTP connection.
         
         Args:
-            msg: The email message
-            recipient: The recipient email address
+            messages: The email messages paired with their recipient addresses
             
         Returns:
-            bool: Whether the email was sent successfully
+            List[bool]: Whether each email was sent successfully, in input order
         """
+        if not messages:
+            return []
+        
         try:
             # Convert to async operation with executor
-            return await asyncio.to_thread(self._send_email_sync, msg, recipient)
+            return await asyncio.to_thread(self._send_emails_sync, messages)
         except Exception as e:
-            logger.error(f"Failed to send email to {recipient}: {str(e)}")
-            return False
+            logger.error(f"Failed to send emails: {str(e)}")
+            return [False] * len(messages)
     
-    def _send_email_sync(self, msg: MIMEMultipart, recipient: str) -> bool:
+    def _send_emails_sync(self, messages: List[Tuple[MIMEMultipart, str]]) -> List[bool]:
         """
-        Synchronous method to send an email via SMTP.
+        Synchronous method to send several emails over one SMTP session.
         """
+        results = [False] * len(messages)
         try:
             logger.info(f"Connecting to SMTP server {EMAIL_HOST}:{EMAIL_PORT}")
-            # Connect to the server
+            # Connect to the server once for all recipients
             with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as server:
                 server.starttls()
                 
@@ -186,12 +163,18 @@ class EmailService:
                     logger.info(f"Logging in with username: {EMAIL_USERNAME}")
                     server.login(EMAIL_USERNAME, EMAIL_PASSWORD)
                 
-                # Send the email
-                logger.info(f"Sending email from {EMAIL_FROM} to {recipient}")
-                server.sendmail(EMAIL_FROM, recipient, msg.as_string())
-                logger.info(f"Email successfully sent to {recipient}")
-            
-            return True
+                # Send the emails
+                for i, (msg, recipient) in enumerate(messages):
+                    try:
+                        logger.info(f"Sending email from {EMAIL_FROM} to {recipient}")
+                        server.sendmail(EMAIL_FROM, recipient, msg.as_string())
+                        logger.info(f"Email successfully sent to {recipient}")
+                        results[i] = True
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as e:
+                        logger.error(f"SMTP Error sending to {recipient}: {str(e)}")
         except Exception as e:
-            logger.error(f"SMTP Error sending to {recipient}: {str(e)}")
-            return False
\ No newline at end of file
+            logger.error(f"SMTP Error: {str(e)}")
+        
+        return results
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+PDF Service - Renders RFP documents to PDF
+"""
+import io
+import re
+from typing import Optional
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+# One content line: a markdown-style heading (e.g. "## Requirements") in groups 1-2,
+# otherwise the body text in group 3
+_LINE_RE = re.compile(r'^(?:[ \t]*(#+)[ \t]+(.*)|(.*))$', re.M)
+
+# PDF paragraph styles, built once at import
+_TITLE_STYLE = ParagraphStyle("RFPTitle", fontName="Helvetica-Bold", fontSize=16, leading=20, alignment=1, spaceAfter=10)
+_CATEGORY_STYLE = ParagraphStyle("RFPCategory", fontName="Helvetica-Bold", fontSize=12, leading=16, spaceAfter=10)
+_BODY_STYLE = ParagraphStyle("RFPBody", fontName="Helvetica", fontSize=11, leading=14, spaceAfter=2)
+_HEADING_STYLES = {
+    1: ParagraphStyle("RFPHeading1", fontName="Helvetica-Bold", fontSize=14, leading=18, spaceBefore=6, spaceAfter=4),
+    2: ParagraphStyle("RFPHeading2", fontName="Helvetica-Bold", fontSize=12, leading=16, spaceBefore=6, spaceAfter=4),
+    3: ParagraphStyle("RFPHeading3", fontName="Helvetica-Bold", fontSize=11, leading=14, spaceBefore=4, spaceAfter=2)
+}
+
+def render_rfp_pdf(title: str, content: str, category: Optional[str] = None) -> bytes:
+    """
+    Render an RFP document to PDF.
+    
+    Args:
+        title: The RFP title
+        content: The RFP content, with markdown-style (#) headings
+        category: The RFP category, shown under the title if given
+        
+    Returns:
+        bytes: The generated PDF as bytes
+    """
+    story = [Paragraph(escape(title), _TITLE_STYLE)]
+    if category:
+        story.append(Paragraph(escape(f"Category: {category}"), _CATEGORY_STYLE))
+    
+    # Markdown-style headings (#, ##, ###) get heading styles, everything else is body text.
+    # Consecutive body lines are laid out as one paragraph, broken at blank lines and headings
+    body_lines = []
+    
+    def flush_body() -> None:
+        if body_lines:
+            story.append(Paragraph("<br/>".join(body_lines), _BODY_STYLE))
+            body_lines.clear()
+    
+    for match in _LINE_RE.finditer(content):
+        hashes, heading_text, line = match.groups()
+        if hashes:
+            flush_body()
+            story.append(Paragraph(escape(heading_text), _HEADING_STYLES.get(len(hashes), _HEADING_STYLES[3])))
+        elif line.strip():
+            body_lines.append(escape(line))
+        else:
+            flush_body()
+    flush_body()
+    
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, title=title).build(story)
+    return buffer.getvalue()
@@ -8,6 +8,32 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4")
 
+# Per-stage models: classification is a short, deterministic task that a
+# smaller model handles well, so it does not default to MODEL_NAME
+CLASSIFICATION_MODEL = os.getenv("CLASSIFICATION_MODEL", "gpt-4o-mini")
+GENERATION_MODEL = os.getenv("GENERATION_MODEL", MODEL_NAME)
+APPROVAL_MODEL = os.getenv("APPROVAL_MODEL", MODEL_NAME)
+
+# Upper bound on concurrent LLM calls made by the batch helpers
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "8"))
+
+# Number of requests classified together in one combined prompt by batch workflows
+CLASSIFICATION_BATCH_SIZE = int(os.getenv("CLASSIFICATION_BATCH_SIZE", "20"))
+
+# Connection pool shared by all agents' OpenAI calls
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "32"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "300"))
+
+# Client-side OpenAI rate limit shared by all agents, and retries for 429s/transient errors
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+# On-disk cache of LLM responses for the classification and RFP generation stages
+# (approval always calls the model). Off unless a path is set: the raw response is
+# cached before it is parsed, so a malformed reply is replayed until the file is
+# deleted, and each RFP prompt always gets the same generated text
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
 
 
 # Email Service Configuration
@@ -16,6 +42,7 @@ EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
 EMAIL_USERNAME = os.getenv("EMAIL_USERNAME", "")  # Your email username
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")  # Your email password or app password
 EMAIL_FROM = os.getenv("EMAIL_FROM", "procurement@company.com")  # The "from" address
+EMAIL_MAX_CONNECTIONS = int(os.getenv("EMAIL_MAX_CONNECTIONS", "4"))  # Parallel SMTP sessions per RFP
 
 # Procurement Categories
 PROCUREMENT_CATEGORIES = ["Software", "Hardware", "Services", "Raw Materials"]
@@ -136,6 +163,12 @@ before they are sent to suppliers. Check for completeness, clarity, compliance w
 and any potential issues or anomalies. Provide clear feedback if revisions are needed.
 """
 
+# Number of LLM validation results kept for identical RFP re-submissions
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "128"))
+
+# Number of classification results the workflow keeps for repeated requests
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "1024"))
+
 # Guardrails
 MAX_BUDGET = 1000000  # $1M budget cap for automatic approval
 MIN_TIMELINE_DAYS = 7  # Minimum timeline of 7 days
\ No newline at end of file
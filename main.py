@@ -2,7 +2,6 @@
 Main entry point for the Procurement Automation System
 """
 import os
-import subprocess
 import sys
 import logging
 from dotenv import load_dotenv
@@ -19,6 +18,9 @@ logging.basicConfig(
 # Load environment variables
 load_dotenv()
 
+# Streamlit UI script, resolved relative to this file so main.py works from any directory
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui", "app.py")
+
 def main():
     """Run the procurement automation system."""
     try:
@@ -30,11 +32,10 @@ def main():
         # Launching the Streamlit UI
         logging.info("Starting Procurement Automation System...")
         
-        # Command to run the Streamlit app, now we can just python main.py to run the streamlit app
-        cmd = ["streamlit", "run", "ui/app.py"]
-        
-        # Run the command
-        subprocess.run(cmd)
+        # Run the Streamlit app in this process rather than spawning a second
+        # interpreter, so we can just python main.py to run the streamlit app
+        from streamlit.web import cli as streamlit_cli
+        streamlit_cli.main(["run", APP_PATH], standalone_mode=False)
     
     except Exception as e:
         logging.error(f"Error starting the application: {str(e)}")
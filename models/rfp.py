@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Literal, Optional, List, Dict
 from datetime import datetime
 from enum import Enum
+import re
+
+# Cheap structural email check; full validation happens once where the address is entered
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
 
 class RFPStatus(str, Enum):
     DRAFT = "draft"
@@ -11,12 +15,25 @@ class RFPStatus(str, Enum):
     SENT = "sent"
     CANCELLED = "cancelled"
 
+# The RFPStatus values as a Literal type. RFP.status stores these plain strings,
+# which pydantic validates without going through Enum coercion; compare and assign
+# them with RFPStatus.<NAME>.value
+RFPStatusValue = Literal["draft", "pending_approval", "approved", "rejected", "sent", "cancelled"]
+
 class Supplier(BaseModel):
     """Model for a supplier."""
     name: str
-    email: EmailStr
+    email: str
     phone: Optional[str] = None
     contact_person: Optional[str] = None
+    
+    @field_validator("email")
+    @classmethod
+    def _check_email(cls, value: str) -> str:
+        """Reject values that are not shaped like an email address."""
+        if not _EMAIL_RE.match(value):
+            raise ValueError("value is not a valid email address")
+        return value
 
 class RFP(BaseModel):
     """Model for a Request for Proposal."""
@@ -25,20 +42,26 @@ class RFP(BaseModel):
     title: str
     category: str
     content: str
-    status: RFPStatus = RFPStatus.DRAFT
+    status: RFPStatusValue = RFPStatus.DRAFT.value
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
-    suppliers: List[Supplier] = []
+    suppliers: List[Supplier] = Field(default_factory=list)
     approval_feedback: Optional[str] = None
     approval_date: Optional[datetime] = None
     sent_date: Optional[datetime] = None
     
-    class Config:
-        use_enum_values = True
+    @model_validator(mode="before")
+    @classmethod
+    def _share_timestamps(cls, data: Any) -> Any:
+        """Give a new RFP the same created/updated time from a single clock read."""
+        if isinstance(data, dict) and "created_at" not in data and "updated_at" not in data:
+            now = datetime.now()
+            data = {**data, "created_at": now, "updated_at": now}
+        return data
 
 class ApprovalResult(BaseModel):
     """Model for the result of RFP approval."""
     rfp_id: str
     approved: bool
     feedback: str
-    issues: List[str] = []
\ No newline at end of file
+    issues: List[str] = Field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,7 @@
+# Shared test setup
+import os
+
+# The agents create their OpenAI chat models on construction; the tests replace
+# every model call, so any key will do and nothing is cached on disk
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ["LLM_CACHE_PATH"] = ""
@@ -1 +1,88 @@
 # Tests for approval agent
+import asyncio
+
+import pytest
+
+from agents import approval_agent
+from agents.approval_agent import ApprovalAgent
+from config.settings import MAX_BUDGET
+from models.rfp import RFP, ApprovalResult
+
+COMPLETE_CONTENT = "Overview\nRequirements\nTimeline\nBudget: $50,000"
+
+
+@pytest.fixture
+def agent():
+    return ApprovalAgent()
+
+
+def make_rfp(content=COMPLETE_CONTENT, title="Laptops"):
+    return RFP(id="rfp-1", request_id="req-1", title=title, category="Hardware", content=content)
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("Budget: $50,000", 50000.0),
+    ("Budget: $ 1,250.50 total", 1250.5),
+    ("Budget of 75,000 USD", 75000.0),
+    ("Up to 20000 dollars", 20000.0),
+    # A dollar-sign amount wins over an earlier USD amount
+    ("10,000 USD now and $30,000 later", 30000.0),
+    # An unparsable "$," is skipped instead of hiding the next amount
+    ("$,\n$5", 5.0),
+    ("No budget given", 0.0),
+])
+def test_extract_budget(agent, content, expected):
+    assert agent._extract_budget(content) == expected
+
+
+def test_guardrails_keep_complete_rfp_within_budget(agent):
+    result = ApprovalResult(rfp_id="rfp-1", approved=True, feedback="ok")
+
+    result = agent._apply_guardrails(make_rfp(), result)
+
+    assert result.approved is True
+    assert result.issues == []
+
+
+def test_guardrails_reject_budget_over_maximum(agent):
+    rfp = make_rfp(content=f"Overview\nRequirements\nTimeline\nBudget: ${MAX_BUDGET + 1:,.0f}")
+    result = ApprovalResult(rfp_id="rfp-1", approved=True, feedback="ok", issues=["from model"])
+
+    result = agent._apply_guardrails(rfp, result)
+
+    assert result.approved is False
+    assert result.issues == ["from model", f"Budget exceeds maximum allowed threshold of ${MAX_BUDGET:,.2f}"]
+
+
+def test_guardrails_report_each_missing_section(agent):
+    result = ApprovalResult(rfp_id="rfp-1", approved=True, feedback="ok")
+
+    # Section names are matched case-insensitively anywhere in the content
+    result = agent._apply_guardrails(make_rfp(content="project OVERVIEW and timeline"), result)
+
+    assert result.approved is False
+    assert result.issues == ["Missing essential section: Requirements", "Missing essential section: Budget"]
+
+
+def test_validate_rfp_does_not_cache_malformed_replies(agent, monkeypatch):
+    replies = [{"feedback": "missing verdict"}, {"approved": True, "feedback": "fine", "issues": []}]
+    calls = []
+
+    class StubChain:
+        async def ainvoke(self, input_data):
+            calls.append(input_data)
+            return replies[len(calls) - 1]
+
+    monkeypatch.setattr(agent, "chain", StubChain())
+    monkeypatch.setattr(approval_agent, "_validation_cache", approval_agent.OrderedDict())
+
+    with pytest.raises(KeyError):
+        asyncio.run(agent.validate_rfp(make_rfp()))
+
+    first = asyncio.run(agent.validate_rfp(make_rfp()))
+    second = asyncio.run(agent.validate_rfp(make_rfp()))
+
+    assert len(calls) == 2
+    assert first.approved and second.approved
+    assert second.feedback == "fine"
+    assert second.issues == []
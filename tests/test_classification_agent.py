@@ -0,0 +1,115 @@
+# Tests for classification agent
+import asyncio
+
+import orjson
+import pytest
+
+from agents.classification_agent import ClassificationAgent
+from models.request import ProcurementRequest, ClassificationResult
+
+
+class StubChain:
+    """Stands in for an LLM chain, answering every call with reply(input_data)."""
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    async def ainvoke(self, input_data):
+        return self.reply(input_data)
+
+
+def use_combined_chain(monkeypatch, reply):
+    chain = StubChain(reply)
+    monkeypatch.setattr(ClassificationAgent, "_build_combined_chain", classmethod(lambda cls: chain))
+
+
+def item(index, category="Hardware"):
+    return {"index": index, "category": category, "confidence": 0.9, "reasoning": "stub"}
+
+
+@pytest.mark.parametrize("response, expected", [
+    ([item(0), item(1)], [0, 1]),
+    # A single-key wrapper object is unwrapped
+    ({"classifications": [item(0), item(1)]}, [0, 1]),
+    # Indexes given as strings or floats are coerced
+    ([item("0"), item(2.0)], [0, 2]),
+    # Malformed items are skipped
+    ([item("x"), {"index": 1, "category": "Hardware"}, "text", item(None), item(3)], [3]),
+    ({"a": [item(0)], "b": [item(1)]}, []),
+    ("not a list", []),
+])
+def test_index_combined_response(response, expected):
+    assert sorted(ClassificationAgent._index_combined_response(response)) == expected
+
+
+def test_classify_combined_maps_items_and_classifies_the_rest_concurrently(monkeypatch):
+    agent = ClassificationAgent()
+    requests = [ProcurementRequest(id=str(i), title=f"request {i}", description="d") for i in range(5)]
+    prompts = []
+    in_flight = []
+    peak = []
+
+    def reply(input_data):
+        prompts.append(input_data)
+        return {"classifications": [item("0", "Software"), item(3, "Services")]}
+
+    async def fake_classify(request):
+        in_flight.append(request.id)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request.id)
+        return ClassificationResult(request_id=request.id, category="Alone", confidence=0.5, reasoning="stub")
+
+    use_combined_chain(monkeypatch, reply)
+    monkeypatch.setattr(agent, "classify", fake_classify)
+
+    results = asyncio.run(agent.classify_combined(requests))
+
+    assert len(prompts) == 1
+    assert [result.request_id for result in results] == ["0", "1", "2", "3", "4"]
+    assert [result.category for result in results] == ["Software", "Alone", "Alone", "Services", "Alone"]
+    assert max(peak) == 3
+
+
+def test_classify_combined_splits_into_batches(monkeypatch):
+    agent = ClassificationAgent()
+    requests = [ProcurementRequest(id=str(i), title=f"request {i}", description="d") for i in range(5)]
+    batch_sizes = []
+
+    def reply(input_data):
+        batch = orjson.loads(input_data["requests"])
+        batch_sizes.append(len(batch))
+        return [item(entry["index"]) for entry in batch]
+
+    use_combined_chain(monkeypatch, reply)
+
+    results = asyncio.run(agent.classify_combined(requests, batch_size=2))
+
+    assert sorted(batch_sizes) == [1, 2, 2]
+    assert [result.request_id for result in results] == ["0", "1", "2", "3", "4"]
+
+
+def test_classify_combined_reclassifies_invalid_items_and_keeps_other_batches(monkeypatch):
+    agent = ClassificationAgent()
+    requests = [ProcurementRequest(id=str(i), title=f"request {i}", description="d") for i in range(6)]
+    alone = []
+
+    def reply(input_data):
+        batch = orjson.loads(input_data["requests"])
+        if batch[0]["title"] == "request 3":
+            raise RuntimeError("combined call failed")
+        # A confidence the model gave as a word fails validation for that item only
+        return [item(0), {**item(1), "confidence": "high"}, item(2)]
+
+    async def fake_classify(request):
+        alone.append(request.id)
+        return ClassificationResult(request_id=request.id, category="Alone", confidence=0.5, reasoning="stub")
+
+    use_combined_chain(monkeypatch, reply)
+    monkeypatch.setattr(agent, "classify", fake_classify)
+
+    results = asyncio.run(agent.classify_combined(requests, batch_size=3))
+
+    assert [result.request_id for result in results] == ["0", "1", "2", "3", "4", "5"]
+    assert [result.category for result in results] == ["Hardware", "Alone", "Hardware", "Alone", "Alone", "Alone"]
+    assert sorted(alone) == ["1", "3", "4", "5"]
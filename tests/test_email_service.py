@@ -0,0 +1,131 @@
+# Tests for the supplier email service
+import asyncio
+import logging
+import smtplib
+from email.mime.text import MIMEText
+
+from api import email_service
+from api.email_service import EmailService
+from models.rfp import RFP, Supplier
+
+
+def make_rfp(emails):
+    return RFP(
+        id="rfp-1",
+        request_id="req-1",
+        title="Laptops",
+        category="Hardware",
+        content="Overview",
+        suppliers=[Supplier(name=f"Supplier {i}", email=email) for i, email in enumerate(emails)]
+    )
+
+
+def stub_service(monkeypatch, failing=()):
+    """An EmailService whose SMTP sessions are recorded instead of opened."""
+    sessions = []
+
+    async def fake_send_emails(messages):
+        recipients = [recipient for _, recipient in messages]
+        sessions.append(recipients)
+        return [recipient not in failing for recipient in recipients]
+
+    service = EmailService()
+    monkeypatch.setattr(service, "_generate_rfp_pdf", lambda rfp: b"%PDF-stub")
+    monkeypatch.setattr(service, "_send_emails", fake_send_emails)
+    return service, sessions
+
+
+def test_send_rfp_spreads_suppliers_round_robin(monkeypatch):
+    monkeypatch.setattr(email_service, "EMAIL_MAX_CONNECTIONS", 2)
+    emails = [f"s{i}@example.com" for i in range(5)]
+    service, sessions = stub_service(monkeypatch)
+
+    assert asyncio.run(service.send_rfp(make_rfp(emails))) is True
+    assert sessions == [
+        ["s0@example.com", "s2@example.com", "s4@example.com"],
+        ["s1@example.com", "s3@example.com"],
+    ]
+
+
+def test_send_rfp_maps_session_results_back_to_suppliers(monkeypatch, caplog):
+    monkeypatch.setattr(email_service, "EMAIL_MAX_CONNECTIONS", 2)
+    emails = [f"s{i}@example.com" for i in range(5)]
+    service, _ = stub_service(monkeypatch, failing={"s3@example.com"})
+
+    with caplog.at_level(logging.INFO, logger=email_service.__name__):
+        assert asyncio.run(service.send_rfp(make_rfp(emails))) is False
+
+    failed = [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR]
+    assert failed == ["Failed to send RFP rfp-1 to s3@example.com"]
+
+
+def test_send_rfp_uses_one_session_per_supplier_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(email_service, "EMAIL_MAX_CONNECTIONS", 4)
+    service, sessions = stub_service(monkeypatch)
+
+    assert asyncio.run(service.send_rfp(make_rfp(["a@example.com", "b@example.com"]))) is True
+    assert sessions == [["a@example.com"], ["b@example.com"]]
+
+
+def test_send_rfp_without_suppliers_sends_nothing(monkeypatch):
+    service, sessions = stub_service(monkeypatch)
+
+    assert asyncio.run(service.send_rfp(make_rfp([]))) is False
+    assert sessions == []
+
+
+class FakeSMTP:
+    """Records one SMTP session; "refused" recipients fail alone, "drop" disconnects the session."""
+    sessions = []
+
+    def __init__(self, host, port):
+        self.log = []
+        FakeSMTP.sessions.append(self.log)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.log.append("quit")
+
+    def starttls(self):
+        self.log.append("starttls")
+
+    def login(self, username, password):
+        self.log.append("login")
+
+    def sendmail(self, sender, recipient, message):
+        if recipient.startswith("refused"):
+            raise smtplib.SMTPRecipientsRefused({recipient: (550, b"no such user")})
+        if recipient.startswith("drop"):
+            raise smtplib.SMTPServerDisconnected("connection lost")
+        self.log.append(recipient)
+
+
+def send_over_fake_smtp(monkeypatch, recipients):
+    FakeSMTP.sessions = []
+    monkeypatch.setattr(email_service.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(email_service, "EMAIL_USERNAME", "user")
+    monkeypatch.setattr(email_service, "EMAIL_PASSWORD", "secret")
+    return EmailService()._send_emails_sync([(MIMEText("body"), recipient) for recipient in recipients])
+
+
+def test_send_emails_sync_uses_one_session_for_all_recipients(monkeypatch):
+    results = send_over_fake_smtp(monkeypatch, ["a@example.com", "b@example.com"])
+
+    assert results == [True, True]
+    assert FakeSMTP.sessions == [["starttls", "login", "a@example.com", "b@example.com", "quit"]]
+
+
+def test_send_emails_sync_fails_only_the_refused_recipient(monkeypatch):
+    results = send_over_fake_smtp(monkeypatch, ["a@example.com", "refused@example.com", "b@example.com"])
+
+    assert results == [True, False, True]
+    assert FakeSMTP.sessions == [["starttls", "login", "a@example.com", "b@example.com", "quit"]]
+
+
+def test_send_emails_sync_fails_the_rest_after_a_disconnect(monkeypatch):
+    results = send_over_fake_smtp(monkeypatch, ["a@example.com", "drop@example.com", "b@example.com"])
+
+    assert results == [True, False, False]
+    assert FakeSMTP.sessions == [["starttls", "login", "a@example.com", "quit"]]
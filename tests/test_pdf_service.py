@@ -0,0 +1,51 @@
+# Tests for the RFP PDF renderer
+from api import pdf_service
+from api.pdf_service import render_rfp_pdf
+
+
+class CapturingDocTemplate:
+    """Stands in for SimpleDocTemplate and keeps the story instead of laying it out."""
+    stories = []
+
+    def __init__(self, buffer, **kwargs):
+        self.buffer = buffer
+
+    def build(self, story):
+        CapturingDocTemplate.stories.append(story)
+        self.buffer.write(b"%PDF-stub")
+
+
+def render_story(monkeypatch, content, category=None):
+    CapturingDocTemplate.stories = []
+    monkeypatch.setattr(pdf_service, "SimpleDocTemplate", CapturingDocTemplate)
+    render_rfp_pdf("RFP <Title>", content, category=category)
+    return [(paragraph.style.name, paragraph.text) for paragraph in CapturingDocTemplate.stories[0]]
+
+
+def test_render_rfp_pdf_returns_pdf_bytes():
+    pdf = render_rfp_pdf("Laptops", "# Overview\nTwenty laptops.", category="Hardware")
+
+    assert pdf.startswith(b"%PDF")
+
+
+def test_headings_and_merged_body_paragraphs(monkeypatch):
+    content = "# Overview\nline one\nline two\n\nline three\n## Requirements\n#### Deep\n  ### Indented"
+
+    assert render_story(monkeypatch, content, category="Hardware") == [
+        ("RFPTitle", "RFP &lt;Title&gt;"),
+        ("RFPCategory", "Category: Hardware"),
+        ("RFPHeading1", "Overview"),
+        ("RFPBody", "line one<br/>line two"),
+        ("RFPBody", "line three"),
+        ("RFPHeading2", "Requirements"),
+        # Deeper headings use the smallest heading style
+        ("RFPHeading3", "Deep"),
+        ("RFPHeading3", "Indented"),
+    ]
+
+
+def test_body_text_is_escaped_and_category_is_optional(monkeypatch):
+    assert render_story(monkeypatch, "Budget < $5 & more\n#no-space") == [
+        ("RFPTitle", "RFP &lt;Title&gt;"),
+        ("RFPBody", "Budget &lt; $5 &amp; more<br/>#no-space"),
+    ]
@@ -0,0 +1,72 @@
+# Tests for the procurement pipeline
+import asyncio
+
+from models.request import ProcurementRequest, ClassificationResult
+from models.rfp import RFP, ApprovalResult
+from workflows.pipeline import ProcurementPipeline
+
+
+class StubClassificationAgent:
+    async def classify(self, request):
+        if request.title == "fail":
+            raise RuntimeError("classify failed")
+        return ClassificationResult(request_id=request.id, category="Hardware", confidence=0.9, reasoning="stub")
+
+
+class StubRFPGenerationAgent:
+    async def generate_rfp(self, request, classification):
+        return RFP(
+            id=f"rfp-{request.id}",
+            request_id=request.id,
+            title=request.title,
+            content="Overview",
+            category=classification.category
+        )
+
+
+class StubApprovalAgent:
+    async def validate_rfp(self, rfp):
+        approved = rfp.title != "reject"
+        return ApprovalResult(rfp_id=rfp.id, approved=approved, feedback="stub feedback")
+
+
+def make_pipeline():
+    return ProcurementPipeline(
+        classification_agent=StubClassificationAgent(),
+        rfp_generation_agent=StubRFPGenerationAgent(),
+        approval_agent=StubApprovalAgent(),
+        workers_per_stage=2
+    )
+
+
+def test_run_returns_results_in_input_order():
+    requests = [ProcurementRequest(id=str(i), title=f"request {i}", description="d") for i in range(5)]
+
+    results = asyncio.run(make_pipeline().run(requests))
+
+    assert [result["request"].id for result in results] == [r.id for r in requests]
+    assert all(result["approval"].approved for result in results)
+    assert all(result["status"] == "RFP approved" for result in results)
+    assert all(result["error"] is None for result in results)
+
+
+def test_run_reports_rejections():
+    results = asyncio.run(make_pipeline().run([ProcurementRequest(id="1", title="reject", description="d")]))
+
+    assert results[0]["approval"].approved is False
+    assert results[0]["status"] == "RFP rejected: stub feedback"
+
+
+def test_failed_stage_stops_that_request_only():
+    requests = [
+        ProcurementRequest(id="1", title="fail", description="d"),
+        ProcurementRequest(id="2", title="ok", description="d")
+    ]
+
+    failed, ok = asyncio.run(make_pipeline().run(requests))
+
+    assert failed["error"] == "classify error: classify failed"
+    assert failed["status"] == "Pipeline failed"
+    assert failed["rfp"] is None
+    assert ok["error"] is None
+    assert ok["rfp"].id == "rfp-2"
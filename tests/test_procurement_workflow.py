@@ -0,0 +1,311 @@
+# Tests for the procurement workflow
+import asyncio
+
+import pytest
+
+from models.request import ProcurementRequest, ClassificationResult
+from models.rfp import RFP, ApprovalResult, RFPStatus, Supplier
+from workflows.procurement_workflow import Node, ProcurementWorkflow
+
+
+class StubAgents:
+    """Stand-ins for the agent methods the workflow nodes call, recording every call."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = set()
+        self.suppliers = []
+
+    async def classify(self, request):
+        self.calls.append(("classify", request.id))
+        await asyncio.sleep(0.01)
+        if "classify" in self.fail:
+            raise RuntimeError("classify failed")
+        return ClassificationResult(request_id=request.id, category="Hardware", confidence=0.9, reasoning="stub")
+
+    def build_context(self, request):
+        if "context" in self.fail:
+            raise RuntimeError("context failed")
+        return {"title": request.title}
+
+    async def generate(self, request, classification, context=None):
+        self.calls.append(("generate", request.id))
+        if "generate" in self.fail:
+            raise RuntimeError("generate failed")
+        return RFP(id=f"rfp-{request.id}", request_id=request.id, title=request.title,
+                   category=classification.category, content="Overview", suppliers=list(self.suppliers))
+
+    async def validate(self, rfp):
+        self.calls.append(("validate", rfp.id))
+        approved = rfp.title != "reject"
+        rfp.status = RFPStatus.APPROVED.value if approved else RFPStatus.REJECTED.value
+        return ApprovalResult(rfp_id=rfp.id, approved=approved, feedback="stub feedback")
+
+    async def send(self, rfp):
+        self.calls.append(("send", rfp.id))
+        return True
+
+
+@pytest.fixture
+def stubs():
+    return StubAgents()
+
+
+@pytest.fixture
+def workflow(stubs):
+    workflow = ProcurementWorkflow()
+    workflow._classify = stubs.classify
+    workflow._build_rfp_context = stubs.build_context
+    workflow._generate = stubs.generate
+    workflow._validate = stubs.validate
+    workflow._send = stubs.send
+    return workflow
+
+
+def make_request(request_id="req-1", title="Laptops", description="Twenty laptops"):
+    return ProcurementRequest(id=request_id, title=title, description=description)
+
+
+def test_execute_runs_every_stage(workflow, stubs):
+    result = asyncio.run(workflow.execute(make_request()))
+
+    assert result["error"] is None
+    assert result["approval"].approved is True
+    assert result["status"] == "No suppliers specified. RFP not sent."
+    assert stubs.calls == [("classify", "req-1"), ("generate", "req-1"), ("validate", "rfp-req-1")]
+
+
+def test_rejected_rfp_ends_without_sending(workflow, stubs):
+    result = asyncio.run(workflow.execute(make_request(title="reject")))
+
+    assert result["error"] is None
+    assert result["status"] == "RFP rejected: stub feedback"
+    assert ("send", "rfp-req-1") not in stubs.calls
+
+
+def test_node_failure_routes_to_error_handler(workflow, stubs):
+    stubs.fail.add("generate")
+
+    result = asyncio.run(workflow.execute(make_request()))
+
+    assert result["error"] == "RFP generation error: generate failed"
+    assert result["status"] == "Workflow failed: RFP generation error: generate failed"
+    assert result["approval"] is None
+    assert [name for name, _ in stubs.calls] == ["classify", "generate"]
+
+
+def test_failures_in_both_parallel_branches_are_merged(workflow, stubs):
+    stubs.fail.update({"classify", "context"})
+
+    result = asyncio.run(workflow.execute(make_request()))
+
+    assert result["error"] in {"Classification error: classify failed", "RFP context error: context failed"}
+    assert result["status"] == f"Workflow failed: {result['error']}"
+    assert [name for name, _ in stubs.calls] == ["classify"]
+
+
+def test_safe_skips_nodes_once_an_error_is_set():
+    calls = []
+
+    async def node(state):
+        calls.append(state)
+        return {"status": "ran"}
+
+    wrapped = ProcurementWorkflow._safe(node, "Stub error")
+
+    assert asyncio.run(wrapped({"error": "earlier failure"})) == {}
+    assert calls == []
+
+
+def test_safe_turns_exceptions_into_an_error_update():
+    async def node(state):
+        raise ValueError("bad input")
+
+    wrapped = ProcurementWorkflow._safe(node, "Stub error")
+
+    assert asyncio.run(wrapped({"error": None, "request": make_request()})) == {"error": "Stub error: bad input"}
+
+
+def test_invalid_request_is_rejected_before_the_graph(workflow, stubs):
+    result = asyncio.run(workflow.execute(make_request(title="  ")))
+
+    assert result["error"] == "Invalid request: a title and description are required"
+    assert result["status"] == "Workflow execution failed"
+    assert stubs.calls == []
+
+
+def test_classify_cached_shares_one_call_between_duplicates(workflow, stubs):
+    async def run():
+        return await asyncio.gather(
+            workflow._classify_cached(make_request("a")),
+            workflow._classify_cached(make_request("b"))
+        )
+
+    first, second = asyncio.run(run())
+    third = asyncio.run(workflow._classify_cached(make_request("c")))
+
+    assert stubs.calls == [("classify", "a")]
+    assert [first.request_id, second.request_id, third.request_id] == ["a", "b", "c"]
+
+
+def test_classify_cached_does_not_keep_failures(workflow, stubs):
+    stubs.fail.add("classify")
+    with pytest.raises(RuntimeError):
+        asyncio.run(workflow._classify_cached(make_request("a")))
+
+    stubs.fail.clear()
+    result = asyncio.run(workflow._classify_cached(make_request("b")))
+
+    assert result.request_id == "b"
+    assert stubs.calls == [("classify", "a"), ("classify", "b")]
+
+
+def test_classify_cached_recovers_from_a_cancelled_call(workflow, stubs):
+    async def run():
+        owner = asyncio.ensure_future(workflow._classify_cached(make_request("owner")))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(workflow._classify_cached(make_request("waiter")))
+        await asyncio.sleep(0)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        # The waiter retries on its own instead of failing with the owner's cancellation
+        waited = await asyncio.wait_for(waiter, 1)
+        later = await asyncio.wait_for(workflow._classify_cached(make_request("later")), 1)
+        return waited, later
+
+    waited, later = asyncio.run(run())
+
+    assert waited.request_id == "waiter"
+    assert later.request_id == "later"
+    assert stubs.calls == [("classify", "owner"), ("classify", "waiter")]
+
+
+def test_stream_yields_each_node_update(workflow):
+    async def run():
+        return [event async for event in workflow.stream(make_request())]
+
+    events = asyncio.run(run())
+    nodes = [node for event in events for node in event]
+
+    assert set(nodes[:2]) == {Node.CLASSIFY, Node.PREFETCH_RFP_CONTEXT}
+    assert nodes[2:] == [Node.GENERATE_RFP, Node.APPROVE_RFP, Node.SEND_EMAIL]
+    assert events[-1][Node.SEND_EMAIL]["status"] == "No suppliers specified. RFP not sent."
+
+
+def use_combined_classification(workflow, stubs, fail=False):
+    """Replace classify_combined with a stub that records the requests it receives."""
+    async def classify_combined(requests):
+        stubs.calls.append(("classify_combined", [request.id for request in requests]))
+        if fail:
+            raise RuntimeError("combined classification failed")
+        return [
+            ClassificationResult(request_id=request.id, category="Combined", confidence=0.8, reasoning="stub")
+            for request in requests
+        ]
+
+    workflow.classification_agent.classify_combined = classify_combined
+
+
+def test_execute_batch_seeds_classifications_and_skips_classify(workflow, stubs):
+    use_combined_classification(workflow, stubs)
+    requests = [make_request("a"), make_request("b", title="Chairs")]
+
+    results = asyncio.run(workflow.execute_batch(requests))
+
+    assert [result["request"].id for result in results] == ["a", "b"]
+    assert all(result["classification"].category == "Combined" for result in results)
+    assert all(result["approval"].approved for result in results)
+    assert stubs.calls[0] == ("classify_combined", ["a", "b"])
+    assert not [call for call in stubs.calls if call[0] == "classify"]
+
+
+def test_execute_batch_keeps_invalid_requests_in_place(workflow, stubs):
+    use_combined_classification(workflow, stubs)
+    requests = [make_request("a"), make_request("b", description=" "), make_request("c", title="Chairs")]
+
+    results = asyncio.run(workflow.execute_batch(requests))
+
+    assert [result["request"].id for result in results] == ["a", "b", "c"]
+    assert results[1]["error"] == "Invalid request: a title and description are required"
+    assert results[1]["classification"] is None
+    assert results[0]["error"] is None and results[2]["error"] is None
+    assert stubs.calls[0] == ("classify_combined", ["a", "c"])
+    assert ("generate", "b") not in stubs.calls
+
+
+def test_execute_batch_classifies_in_the_graph_when_combined_fails(workflow, stubs):
+    use_combined_classification(workflow, stubs, fail=True)
+    requests = [make_request("a"), make_request("b", title="Chairs")]
+
+    results = asyncio.run(workflow.execute_batch(requests))
+
+    assert all(result["error"] is None for result in results)
+    assert [result["classification"].category for result in results] == ["Hardware", "Hardware"]
+    assert sorted(call for call in stubs.calls if call[0] == "classify") == [("classify", "a"), ("classify", "b")]
+
+
+@pytest.fixture
+def emailing_workflow(stubs, monkeypatch):
+    """A background-email workflow that runs the real send_to_suppliers against a stub email service."""
+    stubs.suppliers = [Supplier(name="Acme", email="sales@acme.example.com")]
+    workflow = ProcurementWorkflow(background_email=True)
+    workflow._classify = stubs.classify
+    workflow._build_rfp_context = stubs.build_context
+    workflow._generate = stubs.generate
+    workflow._validate = stubs.validate
+    workflow.sent = []
+    workflow.send_delay = 0.01
+
+    async def send_rfp(rfp):
+        await asyncio.sleep(workflow.send_delay)
+        workflow.sent.append(rfp.id)
+        return True
+
+    monkeypatch.setattr(workflow.approval_agent.email_service, "send_rfp", send_rfp)
+    return workflow
+
+
+def test_background_email_sends_queued_rfp(emailing_workflow):
+    async def execute_and_wait():
+        result = await emailing_workflow.execute(make_request())
+        queued = (result["status"], result["email_sent"], result["rfp"].status)
+        await emailing_workflow.wait_for_emails()
+        return result, queued
+
+    result, queued = asyncio.run(execute_and_wait())
+
+    # The node returns as soon as the RFP is queued; the worker sends it afterwards
+    assert queued == ("RFP queued for supplier dispatch", False, RFPStatus.APPROVED.value)
+    assert emailing_workflow.sent == ["rfp-req-1"]
+    assert result["rfp"].status == RFPStatus.SENT.value
+    assert result["rfp"].sent_date is not None
+
+
+def test_wait_for_emails_drains_the_queue(emailing_workflow):
+    requests = [make_request(request_id=f"req-{i}") for i in range(3)]
+
+    async def execute_and_wait():
+        results = await emailing_workflow.execute_batch(requests)
+        await emailing_workflow.wait_for_emails()
+        return results, emailing_workflow._outbox
+
+    results, outbox = asyncio.run(execute_and_wait())
+
+    assert sorted(emailing_workflow.sent) == ["rfp-req-0", "rfp-req-1", "rfp-req-2"]
+    assert all(result["rfp"].status == RFPStatus.SENT.value for result in results)
+    assert outbox.empty()
+
+
+def test_unsent_rfps_are_logged_when_the_loop_ends(emailing_workflow, caplog):
+    emailing_workflow.send_delay = 1
+    requests = [make_request(request_id=f"req-{i}") for i in range(2)]
+
+    # asyncio.run returns without wait_for_emails, cancelling the worker mid-send
+    results = asyncio.run(emailing_workflow.execute_batch(requests))
+
+    assert emailing_workflow.sent == []
+    assert all(result["rfp"].status == RFPStatus.APPROVED.value for result in results)
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == "WARNING"]
+    assert any("2 RFP(s) not sent" in message for message in warnings)
+    assert any("rfp-req-0" in message and "rfp-req-1" in message for message in warnings)
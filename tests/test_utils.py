@@ -0,0 +1,118 @@
+# Tests for the shared agent helpers
+import asyncio
+import http.server
+import socketserver
+import threading
+
+import httpx
+import pytest
+
+from agents.utils import _PerLoopTransport, gather_bounded
+
+
+class _OkHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connections stay pooled
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server_url():
+    server = _Server(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_per_loop_transport_serves_and_releases_each_loop(server_url):
+    transport = _PerLoopTransport(httpx.Limits())
+    client = httpx.AsyncClient(transport=transport, trust_env=False)
+
+    # Each asyncio.run gets its own pool, which is closed when that loop shuts down
+    for _ in range(3):
+        assert asyncio.run(client.get(server_url)).status_code == 200
+        assert transport._transports == {}
+
+
+def test_per_loop_transport_drops_pools_of_closed_loops(server_url):
+    transport = _PerLoopTransport(httpx.Limits())
+    client = httpx.AsyncClient(transport=transport, trust_env=False)
+
+    # A loop closed without shutting down its async generators keeps its pool until the next request
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(client.get(server_url))
+    loop.close()
+    assert list(transport._transports) == [loop]
+
+    async def request_and_list_loops():
+        await client.get(server_url)
+        return list(transport._transports)
+
+    assert loop not in asyncio.run(request_and_list_loops())
+
+
+def test_gather_bounded_keeps_order_and_caps_concurrency():
+    in_flight = []
+    peak = []
+
+    async def work(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01 * (5 - item))
+        in_flight.remove(item)
+        return item * 10
+
+    results = asyncio.run(gather_bounded(work, range(5), max_concurrent=2))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert max(peak) == 2
+
+
+def test_gather_bounded_cancels_remaining_calls_on_failure():
+    finished = []
+    cancelled = []
+
+    async def work(item):
+        try:
+            await asyncio.sleep(0 if item == 0 else 0.05)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        if item == 0:
+            raise RuntimeError("first call failed")
+        finished.append(item)
+        return item
+
+    with pytest.raises(RuntimeError, match="first call failed"):
+        asyncio.run(gather_bounded(work, range(4), max_concurrent=2))
+
+    # Nothing is left running to completion: the call in flight is cancelled,
+    # and so is any call that got the failed call's slot
+    assert finished == []
+    assert 1 in cancelled
+    assert set(cancelled) <= {1, 2}
+
+
+def test_gather_bounded_can_return_exceptions_per_item():
+    async def work(item):
+        await asyncio.sleep(0.01)
+        if item == 1:
+            raise ValueError("bad item")
+        return item
+
+    results = asyncio.run(gather_bounded(work, range(3), max_concurrent=3, return_exceptions=True))
+
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
@@ -5,11 +5,10 @@ import streamlit as st
 import uuid
 import json
 import asyncio
+import threading
+from collections import deque
 from datetime import datetime, timedelta, time
 from datetime import datetime as dt
-import pandas as pd
-import io
-from fpdf import FPDF
 
 import sys
 import os
@@ -20,48 +19,111 @@ from models.request import ProcurementRequest
 from models.rfp import RFP, RFPStatus, Supplier
 from workflows.procurement_workflow import ProcurementWorkflow
 
-# Function to generate PDF from RFP content
-def generate_rfp_pdf(rfp):
-    # Create PDF object
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Add title
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, rfp.title, 0, 1, "C")
-    pdf.ln(5)
+# Function to generate PDF from RFP content; cached on the plain-string
+# arguments so reruns (e.g. clicking download) reuse the rendered bytes.
+# cache_resource hands back the same immutable bytes object on every hit,
+# where cache_data would unpickle a fresh copy of the whole PDF each time.
+# ReportLab is only imported the first time a PDF is actually requested
+@st.cache_resource(max_entries=32, show_spinner=False)
+def generate_rfp_pdf(rfp_id, title, content):
+    from api.pdf_service import render_rfp_pdf
+    return render_rfp_pdf(title, content)
+
+# Initialize the procurement workflow once per process; Streamlit reruns this
+# script on every interaction, so the agents and their clients are cached
+@st.cache_resource
+def get_workflow():
+    return ProcurementWorkflow()
+
+workflow = get_workflow()
+
+# Run all workflow coroutines on one long-lived event loop in a background thread.
+# The agents share an async HTTP client whose connection pool is bound to the loop
+# it was first used on, so a fresh asyncio.run() loop per call would break its reuse.
+# The loop is a uvloop loop when uvloop is installed (it is not available on Windows)
+@st.cache_resource
+def get_event_loop():
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="workflow-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+# Number of requests (and their workflow results) kept in the session history
+_HISTORY_SIZE = 50
+
+# Time of day used for the required-by date, which the form only collects as a date
+_MIDNIGHT = time.min
+
+async def run_submission(request, supplier):
+    """Run the workflow for a new request, then send the RFP to the supplier if it was approved."""
+    return await send_to_supplier(await workflow.execute(request), supplier)
+
+async def run_reprocess(requests, suppliers):
+    """Rerun the workflow for many requests, then send each approved RFP to its request's supplier."""
+    results = await workflow.execute_batch(requests)
+    return await asyncio.gather(*(
+        send_to_supplier(result, suppliers.get(result['request'].id)) for result in results
+    ))
+
+async def send_to_supplier(result, supplier):
+    """Attach the supplier to the generated RFP and email it if the RFP was approved."""
+    if supplier is None:
+        return result
     
-    # Add RFP content
-    pdf.set_font("Arial", "", 11)
+    # Add supplier to the RFP if the RFP was generated
+    if result.get("rfp"):
+        result["rfp"].suppliers = [supplier]
+        
+        # If the RFP was approved, try to send the email
+        if result.get("approval") and result["approval"].approved:
+            try:
+                email_sent = await workflow.approval_agent.send_to_suppliers(result["rfp"])
+                result["email_sent"] = email_sent
+                # Update the status message to reflect that email was sent
+                result["status"] = "RFP sent to suppliers" if email_sent else "Failed to send RFP to suppliers"
+            except Exception as e:
+                # This runs on the event loop thread, so report through the result
+                # (shown as the status) rather than calling st.error here
+                result["error"] = f"Email sending error: {str(e)}"
+                result["status"] = f"Error sending email: {str(e)}"
+                result["email_sent"] = False
     
-    # Split content by lines and add each line
-    lines = rfp.content.split("\n")
-    for line in lines:
-        # Check if line is a heading (starts with #)
-        if line.strip().startswith("#"):
-            # Count the level of heading
-            heading_level = len(line.split(" ")[0])
-            heading_text = " ".join(line.split(" ")[1:])
-            
-            if heading_level == 1:
-                pdf.set_font("Arial", "B", 14)
-            elif heading_level == 2:
-                pdf.set_font("Arial", "B", 12)
-            else:
-                pdf.set_font("Arial", "B", 11)
-                
-            pdf.cell(0, 10, heading_text, 0, 1)
-            pdf.set_font("Arial", "", 11)
-        else:
-            # Regular text
-            if line.strip():  # Skip empty lines
-                pdf.multi_cell(0, 5, line)
+    return result
+
+def open_history_request(history):
+    """Show the request picked in the sidebar history, then reset the picker so it can be picked again."""
+    req_id = st.session_state.history_select
+    st.session_state.history_select = None
+    if req_id is None:
+        return
     
-    # Return PDF as bytes
-    return pdf.output(dest="S").encode("latin1")
+    req = history[req_id]
+    st.session_state.current_request = req
+    st.session_state.workflow_result = st.session_state.workflow_results.get(req.id)
+    if req.id in st.session_state.suppliers:
+        st.session_state.current_supplier = st.session_state.suppliers[req.id]
+    st.session_state.show_form = False
 
-# Initialize the procurement workflow
-workflow = ProcurementWorkflow()
+def store_result(result):
+    """Store a workflow result under its request id, dropping the oldest beyond the history size."""
+    results = st.session_state.workflow_results
+    results[result['request'].id] = result
+    if len(results) > _HISTORY_SIZE:
+        del results[next(iter(results))]
+
+def store_supplier(request_id, supplier):
+    """Remember the supplier a request was submitted with, dropping the oldest beyond the history size."""
+    suppliers = st.session_state.suppliers
+    suppliers[request_id] = supplier
+    if len(suppliers) > _HISTORY_SIZE:
+        del suppliers[next(iter(suppliers))]
 
 # Set page config
 st.set_page_config(
@@ -75,7 +137,13 @@ st.set_page_config(
 
 # I am intializing the  session state to store the requests, current request, workflow results, and form visibility
 if 'requests' not in st.session_state:
-    st.session_state.requests = []
+    st.session_state.requests = deque(maxlen=_HISTORY_SIZE)
+
+if 'workflow_results' not in st.session_state:
+    st.session_state.workflow_results = {}  # Keyed by request id, oldest first
+
+if 'suppliers' not in st.session_state:
+    st.session_state.suppliers = {}  # Supplier each request was submitted with, keyed by request id
 
 if 'current_request' not in st.session_state:
     st.session_state.current_request = None
@@ -105,18 +173,40 @@ with st.sidebar:
         st.session_state.workflow_result = None
         st.session_state.show_form = True
     
+    # Requests whose workflow failed or never reached approval
+    completed_ids = {
+        req_id
+        for req_id, result in st.session_state.workflow_results.items()
+        if result.get('approval') and not result.get('error')
+    }
+    pending = [req for req in st.session_state.requests if req.id not in completed_ids]
+    
+    if pending and st.button(f"Reprocess all pending ({len(pending)})"):
+        with st.spinner("Reprocessing pending requests..."):
+            # Classify all pending requests together, run the rest of the workflow for each,
+            # then email the approved RFPs to the suppliers they were submitted with
+            results = run_async(run_reprocess(pending, st.session_state.suppliers))
+    
+        for result in results:
+            store_result(result)
+        st.session_state.current_request = None
+        st.session_state.workflow_result = None
+        st.rerun()
+    
     if st.session_state.requests:
         st.subheader("Recent Requests")
-        for i, req in enumerate(st.session_state.requests):
-            if st.button(f"{req.title} ({req.created_at.strftime('%Y-%m-%d')})", key=f"history_{i}"):
-                st.session_state.current_request = req
-                # Find the corresponding workflow result
-                for result in st.session_state.get('workflow_results', []):
-                    if result['request'].id == req.id:
-                        st.session_state.workflow_result = result
-                        break
-                st.session_state.show_form = False
-                st.rerun()
+        # A single picker instead of one button per request keeps the widget count constant
+        history = {req.id: req for req in st.session_state.requests}
+        st.selectbox(
+            "Open a previous request",
+            options=list(history),
+            format_func=lambda req_id: f"{history[req_id].title} ({history[req_id].created_at.strftime('%Y-%m-%d')})",
+            index=None,
+            placeholder="Select a request",
+            key="history_select",
+            on_change=open_history_request,
+            args=(history,)
+        )
 
 # Main content area
 if st.session_state.show_form:
@@ -170,8 +260,20 @@ if st.session_state.show_form:
         submitted = st.form_submit_button("Submit Request")
         
         if submitted:
+            # Check the supplier email once here; the Supplier below is then built without re-validation
+            email_error = None
+            if supplier_email:
+                from email_validator import validate_email, EmailNotValidError
+                
+                try:
+                    supplier_email = validate_email(supplier_email, check_deliverability=False).normalized
+                except EmailNotValidError as e:
+                    email_error = str(e)
+            
             if not title or not description or not supplier_name or not supplier_email:
                 st.error("Please fill in all required fields marked with *")
+            elif email_error:
+                st.error(f"Please enter a valid supplier email: {email_error}")
             else:
                 # Creating a new procurement request
                 req_id = str(uuid.uuid4())
@@ -179,7 +281,7 @@ if st.session_state.show_form:
                 # Converting the date to datetime if provided
                 req_date = None
                 if required_by_date:
-                    req_date = datetime.combine(required_by_date, datetime.min.time())
+                    req_date = datetime.combine(required_by_date, _MIDNIGHT)
                 
                 new_request = ProcurementRequest(
                     id=req_id,
@@ -195,45 +297,28 @@ if st.session_state.show_form:
                 
                 # Add to session state
                 st.session_state.current_request = new_request
-                st.session_state.requests.insert(0, new_request)  # Add  new request to start of list to show the most recent req first
+                st.session_state.requests.appendleft(new_request)  # Add  new request to start of list to show the most recent req first
                 
                 # Process with the workflow
                 with st.spinner("Processing your request..."):
                     # Create a supplier with the provided information
-                    supplier = Supplier(
+                    supplier = Supplier.model_construct(
                         name=supplier_name,
                         email=supplier_email,
                         contact_person=supplier_contact
                     )
                     
-                    # Store supplier in session state to use later
+                    # Store supplier in session state to use later, including for reprocessing
                     st.session_state.current_supplier = supplier
+                    store_supplier(new_request.id, supplier)
                     
-                    # Run the workflow
-                    result = asyncio.run(workflow.execute(new_request))
-                    
-                    # Add supplier to the RFP if the RFP was generated
-                    if result.get("rfp"):
-                        result["rfp"].suppliers = [supplier]
-                        
-                        # If the RFP was approved, try to send the email
-                        if result.get("approval") and result["approval"].approved:
-                            try:
-                                email_sent = asyncio.run(workflow.approval_agent.send_to_suppliers(result["rfp"]))
-                                result["email_sent"] = email_sent
-                                # Update the status message to reflect that email was sent
-                                result["status"] = "RFP sent to suppliers" if email_sent else "Failed to send RFP to suppliers"
-                            except Exception as e:
-                                st.error(f"Error sending email: {str(e)}")
-                                result["error"] = f"Email sending error: {str(e)}"
-                                result["email_sent"] = False
+                    # Run the workflow and the supplier email on the shared event loop
+                    result = run_async(run_submission(new_request, supplier))
                     
                     st.session_state.workflow_result = result
                     
                     # Store the workflow result
-                    if 'workflow_results' not in st.session_state:
-                        st.session_state.workflow_results = []
-                    st.session_state.workflow_results.append(result)
+                    store_result(result)
                 
                 # Switch to results view
                 st.session_state.show_form = False
@@ -319,7 +404,7 @@ else:
                 # Generate and download PDF
                 if st.button("Generate PDF"):
                     try:
-                        pdf_bytes = generate_rfp_pdf(rfp)
+                        pdf_bytes = generate_rfp_pdf(rfp.id, rfp.title, rfp.content)
                         st.success("PDF generated successfully!")
                         
                         # Add download button for PDF
@@ -368,7 +453,7 @@ else:
                             })
                         
                         st.subheader("Supplier Communication")
-                        st.table(pd.DataFrame(suppliers_data))
+                        st.table(suppliers_data)
                 else:
                     st.warning("RFP has not been sent to suppliers yet.")
             else:
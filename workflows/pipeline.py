@@ -0,0 +1,144 @@
+"""
+Procurement Pipeline - Streams a batch of requests through the agents as overlapping stages.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from agents.classification_agent import ClassificationAgent
+from agents.rfp_generation_agent import RFPGenerationAgent
+from agents.approval_agent import ApprovalAgent
+from config.settings import MAX_CONCURRENT_LLM_CALLS
+from models.request import ProcurementRequest
+
+logger = logging.getLogger(__name__)
+
+class ProcurementPipeline:
+    """
+    Runs many procurement requests through classification, RFP generation and
+    approval, with each stage fed by its own queue.
+
+    A request moves on to the next stage as soon as its current stage finishes,
+    so generating the RFP for one request overlaps classifying the next one
+    instead of waiting for the whole batch.
+    """
+
+    def __init__(
+        self,
+        classification_agent: Optional[ClassificationAgent] = None,
+        rfp_generation_agent: Optional[RFPGenerationAgent] = None,
+        approval_agent: Optional[ApprovalAgent] = None,
+        workers_per_stage: int = MAX_CONCURRENT_LLM_CALLS
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            classification_agent: Agent for the classification stage
+            rfp_generation_agent: Agent for the RFP generation stage
+            approval_agent: Agent for the approval stage
+            workers_per_stage: Number of concurrent workers (and LLM calls) per stage
+        """
+        self.classification_agent = classification_agent or ClassificationAgent()
+        self.rfp_generation_agent = rfp_generation_agent or RFPGenerationAgent()
+        self.approval_agent = approval_agent or ApprovalAgent()
+        self.workers_per_stage = workers_per_stage
+
+    async def _classify(self, result: Dict[str, Any]) -> None:
+        """Run the classification stage for a single request."""
+        classification = await self.classification_agent.classify(result["request"])
+        result["classification"] = classification
+        result["status"] = f"Classified as {classification.category} with {classification.confidence:.2f} confidence"
+
+    async def _generate(self, result: Dict[str, Any]) -> None:
+        """Run the RFP generation stage for a single request."""
+        rfp = await self.rfp_generation_agent.generate_rfp(result["request"], result["classification"])
+        result["rfp"] = rfp
+        result["status"] = f"RFP generated for {rfp.category}"
+
+    async def _approve(self, result: Dict[str, Any]) -> None:
+        """Run the approval stage for a single request."""
+        approval = await self.approval_agent.validate_rfp(result["rfp"])
+        result["approval"] = approval
+        result["status"] = "RFP approved" if approval.approved else f"RFP rejected: {approval.feedback}"
+
+    async def _worker(
+        self,
+        queue: asyncio.Queue,
+        step: Callable[[Dict[str, Any]], Awaitable[None]],
+        next_queue: Optional[asyncio.Queue]
+    ) -> None:
+        """
+        Process items from one stage queue forever, forwarding successes to the next stage.
+
+        Args:
+            queue: The queue feeding this stage
+            step: The stage function to apply to each item
+            next_queue: The queue feeding the next stage, or None for the last stage
+        """
+        while True:
+            result = await queue.get()
+            try:
+                await step(result)
+                if next_queue is not None:
+                    next_queue.put_nowait(result)
+            except Exception as e:
+                logger.exception("Pipeline stage %s failed for request %s", step.__name__, result["request"].id)
+                result["error"] = f"{step.__name__.strip('_')} error: {str(e)}"
+                result["status"] = "Pipeline failed"
+            finally:
+                queue.task_done()
+
+    async def run(self, requests: List[ProcurementRequest]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of procurement requests through all stages.
+
+        Args:
+            requests: The procurement requests to process
+
+        Returns:
+            List[Dict[str, Any]]: One result per request, in input order, with the
+            same keys as the workflow state
+        """
+        results = [
+            {
+                "request": request,
+                "classification": None,
+                "rfp": None,
+                "approval": None,
+                "email_sent": False,
+                "error": None,
+                "status": "Queued in procurement pipeline"
+            }
+            for request in requests
+        ]
+
+        classify_queue: asyncio.Queue = asyncio.Queue()
+        generate_queue: asyncio.Queue = asyncio.Queue()
+        approve_queue: asyncio.Queue = asyncio.Queue()
+        stages = [
+            (classify_queue, self._classify, generate_queue),
+            (generate_queue, self._generate, approve_queue),
+            (approve_queue, self._approve, None)
+        ]
+
+        workers = [
+            asyncio.create_task(self._worker(queue, step, next_queue))
+            for queue, step, next_queue in stages
+            for _ in range(self.workers_per_stage)
+        ]
+
+        for result in results:
+            classify_queue.put_nowait(result)
+
+        try:
+            # Items are forwarded before task_done(), so each stage is fully
+            # drained once every earlier stage has been joined
+            for queue, _, _ in stages:
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return results
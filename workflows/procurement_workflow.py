@@ -1,47 +1,98 @@
 """
 Procurement Workflow - Orchestrates the multi-agent procurement process using LangGraph.
 """
-from typing import Dict, Any, List, Tuple, Union, TypedDict, Annotated
-from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, Final, List, Optional, Tuple, Union, TypedDict, Annotated
 import uuid
 from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
 
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph import add_messages
 
 from agents.classification_agent import ClassificationAgent
 from agents.rfp_generation_agent import RFPGenerationAgent
 from agents.approval_agent import ApprovalAgent
+from agents.utils import gather_bounded
+from config.settings import MAX_CONCURRENT_LLM_CALLS, CLASSIFICATION_CACHE_SIZE
 from models.request import ProcurementRequest, ClassificationResult
 from models.rfp import RFP, RFPStatus, ApprovalResult, Supplier
 
-# Define the state schema for the workflow
+logger = logging.getLogger(__name__)
+
+def _keep_latest(current: Any, update: Any) -> Any:
+    """State reducer that keeps the newest non-None value written to a key."""
+    return update if update is not None else current
+
+# Define the state schema for the workflow. The keys both parallel branches
+# (classify and prefetch) may write in the same step need a reducer.
 class WorkflowState(TypedDict):
     request: ProcurementRequest
     classification: Union[ClassificationResult, None]
+    rfp_context: Union[Dict[str, Any], None]
     rfp: Union[RFP, None]
     approval: Union[ApprovalResult, None]
     email_sent: bool
-    error: Union[str, None]
-    status: str
+    error: Annotated[Union[str, None], _keep_latest]
+    status: Annotated[str, _keep_latest]
+
+# Template for the keys every run starts with; request and classification are filled in per run
+_INITIAL_STATE: Final[Dict[str, Any]] = {
+    "rfp_context": None,
+    "rfp": None,
+    "approval": None,
+    "email_sent": False,
+    "error": None,
+    "status": "Started procurement workflow"
+}
+
+# Define the node names for clarity; plain string constants, which LangGraph uses as-is
+class Node:
+    CLASSIFY: Final[str] = "classify"
+    PREFETCH_RFP_CONTEXT: Final[str] = "prefetch_rfp_context"
+    GENERATE_RFP: Final[str] = "generate_rfp"
+    APPROVE_RFP: Final[str] = "approve_rfp"
+    SEND_EMAIL: Final[str] = "send_email"
+    ERROR_HANDLER: Final[str] = "error_handler"
 
-# Define the node names for clarity
-class Node(str, Enum):
-    CLASSIFY = "classify"
-    GENERATE_RFP = "generate_rfp"
-    APPROVE_RFP = "approve_rfp"
-    SEND_EMAIL = "send_email"
-    ERROR_HANDLER = "error_handler" 
+_NODE_NAMES: Final[Tuple[str, ...]] = (
+    Node.CLASSIFY, Node.PREFETCH_RFP_CONTEXT, Node.GENERATE_RFP,
+    Node.APPROVE_RFP, Node.SEND_EMAIL, Node.ERROR_HANDLER
+)
 
 class ProcurementWorkflow:
     """Orchestrates the multi-agent procurement process."""
     
-    def __init__(self):
-        """Initialize the procurement workflow with all required agents."""
+    def __init__(self, background_email: bool = False):
+        """
+        Initialize the procurement workflow with all required agents.
+        
+        Args:
+            background_email: If True, approved RFPs are queued and sent to suppliers by a
+                background task, so a run finishes without waiting for the emails
+        """
         self.classification_agent = ClassificationAgent()
         self.rfp_generation_agent = RFPGenerationAgent()
         self.approval_agent = ApprovalAgent()
+        # Bind the agent calls each node makes once, instead of looking them up on every run
+        self._classify = self.classification_agent.classify
+        self._build_rfp_context = self.rfp_generation_agent.build_context
+        self._generate = self.rfp_generation_agent.generate_rfp
+        self._validate = self.approval_agent.validate_rfp
+        self._send = self.approval_agent.send_to_suppliers
+        # Classifications (or in-flight classification calls) keyed by request fingerprint
+        self._classify_cache: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        # Background email dispatch; the queue and its worker belong to the loop they were created on
+        self.background_email = background_email
+        self._outbox: Optional[asyncio.Queue] = None
+        self._outbox_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._outbox_worker: Optional[asyncio.Task] = None
         self.graph = self._build_workflow()
+        # The graph never changes shape, so compile it once and reuse it for every run
+        self.compiled = self.graph.compile()
+        logger.debug("Workflow graph nodes: %s", _NODE_NAMES)
     
     def _build_workflow(self) -> StateGraph:
         """
@@ -53,22 +104,32 @@ class ProcurementWorkflow:
         # Create workflow graph
         graph = StateGraph(WorkflowState)
         
-        # Add nodes for each step
-        graph.add_node(Node.CLASSIFY, self._classify_request)
-        graph.add_node(Node.GENERATE_RFP, self._generate_rfp)
-        graph.add_node(Node.APPROVE_RFP, self._approve_rfp)
-        graph.add_node(Node.SEND_EMAIL, self._send_email)
-        graph.add_node(Node.ERROR_HANDLER, self._handle_error)  # Changed to ERROR_HANDLER
+        # Add nodes for each step; failures in any step are recorded by _safe
+        # and routed to the error handler instead of being handled per node
+        graph.add_node(Node.CLASSIFY, self._safe(self._classify_request, "Classification error"))
+        graph.add_node(Node.PREFETCH_RFP_CONTEXT, self._safe(self._prefetch_rfp_context, "RFP context error"))
+        graph.add_node(Node.GENERATE_RFP, self._safe(self._generate_rfp, "RFP generation error"))
+        graph.add_node(Node.APPROVE_RFP, self._safe(self._approve_rfp, "Approval error"))
+        graph.add_node(Node.SEND_EMAIL, self._safe(self._send_email, "Email sending error"))
+        graph.add_node(Node.ERROR_HANDLER, self._handle_error)
         
         # Define the edges
-        # Start with classification
-        graph.set_entry_point(Node.CLASSIFY)
+        # Start with classification, preparing the category-independent RFP inputs in parallel
+        graph.add_edge(START, Node.CLASSIFY)
+        graph.add_edge(START, Node.PREFETCH_RFP_CONTEXT)
         
-        # After classification, generate RFP
-        graph.add_edge(Node.CLASSIFY, Node.GENERATE_RFP)
+        # Once both branches are done, generate RFP (skipped by _safe if either branch failed)
+        graph.add_edge([Node.CLASSIFY, Node.PREFETCH_RFP_CONTEXT], Node.GENERATE_RFP)
         
         # After RFP generation, go to approval
-        graph.add_edge(Node.GENERATE_RFP, Node.APPROVE_RFP)
+        graph.add_conditional_edges(
+            Node.GENERATE_RFP,
+            self._route_on_error,
+            {
+                "ok": Node.APPROVE_RFP,
+                "error": Node.ERROR_HANDLER
+            }
+        )
         
         # From approval, either send email or end based on approval status
         graph.add_conditional_edges(
@@ -76,19 +137,54 @@ class ProcurementWorkflow:
             self._route_after_approval,
             {
                 "approved": Node.SEND_EMAIL,
-                "rejected": END
+                "rejected": END,
+                "error": Node.ERROR_HANDLER
             }
         )
         
         # After sending email, end the workflow
-        graph.add_edge(Node.SEND_EMAIL, END)
+        graph.add_conditional_edges(
+            Node.SEND_EMAIL,
+            self._route_on_error,
+            {
+                "ok": END,
+                "error": Node.ERROR_HANDLER
+            }
+        )
         
-        # Error handling from any node to error node
-        graph.add_edge(Node.ERROR_HANDLER, END)  # Changed to ERROR_HANDLER
+        graph.add_edge(Node.ERROR_HANDLER, END)
         
         return graph
     
-    async def _classify_request(self, state: WorkflowState) -> WorkflowState:
+    @staticmethod
+    def _safe(
+        node: Callable[[WorkflowState], Awaitable[Dict[str, Any]]],
+        error_label: str
+    ) -> Callable[[WorkflowState], Awaitable[Dict[str, Any]]]:
+        """
+        Wrap a node so that any exception is recorded in the state instead of aborting the run.
+        
+        The wrapped node is skipped entirely once an earlier step has failed.
+        
+        Args:
+            node: The node function to wrap
+            error_label: Prefix for the error message recorded on failure
+            
+        Returns:
+            Callable: The wrapped node function
+        """
+        async def wrapped(state: WorkflowState) -> Dict[str, Any]:
+            if state["error"] is not None:
+                return {}
+            try:
+                return await node(state)
+            except Exception as e:
+                logger.exception("Workflow node %s failed for request %s", node.__name__, state["request"].id)
+                return {"error": f"{error_label}: {str(e)}"}
+        
+        return wrapped
+    
+    async def _classify_request(self, state: WorkflowState) -> Dict[str, Any]:
         """
         Classify the procurement request.
         
@@ -96,58 +192,102 @@ class ProcurementWorkflow:
             state: The current workflow state
             
         Returns:
-            WorkflowState: The updated workflow state
+            Dict[str, Any]: The state updates (only the changed keys)
         """
-        try:
-            print("Starting classification process...")
-            
-            # Get the request from the state
-            request = state["request"]
-            print(f"Request to classify: {request.title} - {request.description[:50]}...")
+        # Skip the LLM call if the request was already classified (e.g. by execute_batch)
+        if state["classification"] is not None:
+            logger.debug("Request %s already classified; skipping classification", state["request"].id)
+            return {}
+        
+        # Get the request from the state
+        request = state["request"]
+        logger.debug("Request to classify: %s - %.50s...", request.title, request.description)
+        
+        # Classify the request
+        classification = await self._classify_cached(request)
+        
+        logger.debug("Classification result: %s with confidence %.2f", classification.category, classification.confidence)
+        
+        return {
+            "classification": classification,
+            "status": f"Classified as {classification.category} with {classification.confidence:.2f} confidence"
+        }
+    
+    async def _classify_cached(self, request: ProcurementRequest) -> ClassificationResult:
+        """
+        Classify a request, reusing the result for requests with identical content.
+        
+        Requests are fingerprinted on the fields the classification prompt uses.
+        A duplicate that arrives while the first one is still being classified
+        waits for that same call instead of making another one.
+        
+        Args:
+            request: The procurement request to classify
             
-            # Classify the request
+        Returns:
+            ClassificationResult: The classification result for this request
+        """
+        key = hashlib.blake2b(
+            f"{request.title}|{request.description}|{request.additional_notes or ''}".encode(),
+            digest_size=16
+        ).hexdigest()
+        
+        loop = asyncio.get_running_loop()
+        future = self._classify_cache.get(key)
+        if future is not None and future.done():
+            # Finished classifications are plain values and can be reused from any loop
+            self._classify_cache.move_to_end(key)
+            logger.debug("Reusing classification for request %s", request.id)
+            return future.result().model_copy(update={"request_id": request.id})
+        if future is not None and future.get_loop() is loop:
+            logger.debug("Waiting for in-flight classification of request %s", request.id)
             try:
-                print("Calling classification agent...")
-                classification = await self.classification_agent.classify(request)
-                print(f"Classification result: {classification.category} with confidence {classification.confidence}")
-            except Exception as classification_error:
-                print(f"Error during classification: {str(classification_error)}")
-                import traceback
-                traceback.print_exc()
-                return {
-                    **state,
-                    "error": f"Classification error: {str(classification_error)}",
-                    "status": "Error during classification"
-                }
-            
-            # Verify classification is not None
-            if classification is None:
-                print("ERROR: Classification result is None")
-                return {
-                    **state,
-                    "error": "Classification returned None",
-                    "status": "Error: Classification failed"
-                }
-            
-            # Update and return the state
-            updated_state = {
-                **state,
-                "classification": classification,
-                "status": f"Classified as {classification.category} with {classification.confidence:.2f} confidence"
-            }
-            print(f"Updated state after classification: classification is {'present' if updated_state.get('classification') is not None else 'None'}")
-            return updated_state
-        except Exception as e:
-            print(f"Unexpected error in _classify_request: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                **state,
-                "error": f"Classification error: {str(e)}",
-                "status": "Error during classification"
-            }
+                classification = await asyncio.shield(future)
+                return classification.model_copy(update={"request_id": request.id})
+            except asyncio.CancelledError:
+                # Only swallow the cancellation of the call we were waiting on;
+                # if this task was cancelled, propagate it
+                if not future.cancelled():
+                    raise
+            logger.debug("In-flight classification was cancelled; retrying request %s", request.id)
+            return await self._classify_cached(request)
+        
+        # Miss, or an in-flight call on another loop (which this loop cannot await)
+        future = loop.create_future()
+        self._classify_cache[key] = future
+        if len(self._classify_cache) > CLASSIFICATION_CACHE_SIZE:
+            self._classify_cache.popitem(last=False)
+        
+        try:
+            classification = await self._classify(request)
+        except BaseException as e:
+            # Don't cache failures; waiting duplicates get the same exception,
+            # or retry on their own if this call was cancelled
+            if self._classify_cache.get(key) is future:
+                del self._classify_cache[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # Mark retrieved so asyncio doesn't warn when nobody was waiting
+            else:
+                future.cancel()
+            raise
+        
+        future.set_result(classification)
+        return classification
+    
+    async def _prefetch_rfp_context(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Prepare the category-independent RFP generation inputs while the request is classified.
+        
+        Args:
+            state: The current workflow state
             
-    async def _generate_rfp(self, state: WorkflowState) -> WorkflowState:
+        Returns:
+            Dict[str, Any]: The state update with the RFP context
+        """
+        return {"rfp_context": self._build_rfp_context(state["request"])}
+    
+    async def _generate_rfp(self, state: WorkflowState) -> Dict[str, Any]:
         """
         Generate an RFP based on the classified request.
         
@@ -155,110 +295,62 @@ class ProcurementWorkflow:
             state: The current workflow state
             
         Returns:
-            WorkflowState: The updated workflow state
+            Dict[str, Any]: The state updates (only the changed keys)
         """
-        try:
-            print("Starting RFP generation process...")
-            
-            # Get the request and classification from the state
-            request = state["request"]
-            classification = state["classification"]
-            
-            if classification is None:
-                print("ERROR: Classification is None in _generate_rfp")
-                return {
-                    **state,
-                    "error": "No classification result available",
-                    "status": "Error: Classification failed"
-                }
-            
-            print(f"Generating RFP for request: {request.title}, category: {classification.category}")
-            
-            # Generate the RFP
-            try:
-                rfp = await self.rfp_generation_agent.generate_rfp(request, classification)
-                print(f"RFP generated successfully with ID: {rfp.id}")
-            except Exception as generation_error:
-                print(f"Error during RFP generation: {str(generation_error)}")
-                import traceback
-                traceback.print_exc()
-                return {
-                    **state,
-                    "error": f"RFP generation error: {str(generation_error)}",
-                    "status": "Error during RFP generation"
-                }
-            
-            # Verify the RFP object is valid
-            if rfp is None:
-                print("ERROR: Generated RFP is None")
-                return {
-                    **state,
-                    "error": "RFP generation returned None",
-                    "status": "Error: RFP generation failed"
-                }
-            
-            print(f"Generated RFP with title: {rfp.title}, status: {rfp.status}")
-            
-            # Update and return the state
-            updated_state = {
-                **state,
-                "rfp": rfp,
-                "status": f"RFP generated for {classification.category}"
-            }
-            print(f"Updated state after RFP generation: RFP is {'present' if updated_state.get('rfp') is not None else 'None'}")
-            return updated_state
-        except Exception as e:
-            print(f"Unexpected error in _generate_rfp: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                **state,
-                "error": f"RFP generation error: {str(e)}",
-                "status": "Error during RFP generation"
-            }
+        # Get the request and classification from the state
+        request = state["request"]
+        classification = state["classification"]
+        
+        logger.debug("Generating RFP for request: %s, category: %s", request.title, classification.category)
+        
+        # Generate the RFP
+        rfp = await self._generate(
+            request, classification, context=state["rfp_context"]
+        )
+        
+        logger.debug("Generated RFP %s with title: %s, status: %s", rfp.id, rfp.title, rfp.status)
+        
+        return {
+            "rfp": rfp,
+            "status": f"RFP generated for {classification.category}"
+        }
     
-    async def _approve_rfp(self, state: WorkflowState) -> WorkflowState:
-        try:
-            print("Starting RFP approval process...")
-            rfp = state["rfp"]
-            
-            if rfp is None:
-                print("ERROR: RFP is None in _approve_rfp")
-                return {
-                    **state,
-                    "error": "No RFP to validate",
-                    "status": "Error: No RFP to validate"
-                }
-            
-            print(f"Validating RFP with ID: {rfp.id}")
-            # Validate the RFP
-            try:
-                approval = await self.approval_agent.validate_rfp(rfp)
-                print(f"Approval result: {approval.approved}")
-            except Exception as validation_error:
-                print(f"Error during RFP validation: {str(validation_error)}")
-                import traceback
-                traceback.print_exc()
-                raise validation_error
+    async def _approve_rfp(self, state: WorkflowState) -> Dict[str, Any]:
+        """
+        Validate the generated RFP.
+        
+        Args:
+            state: The current workflow state
             
-            # Update the status message
-            status = "RFP approved" if approval.approved else f"RFP rejected: {approval.feedback}"
+        Returns:
+            Dict[str, Any]: The state updates (only the changed keys)
+        """
+        rfp = state["rfp"]
+        
+        logger.debug("Validating RFP with ID: %s", rfp.id)
+        # Validate the RFP
+        approval = await self._validate(rfp)
+        logger.debug("Approval result: %s", approval.approved)
+        
+        # Update the status message
+        status = "RFP approved" if approval.approved else f"RFP rejected: {approval.feedback}"
+        
+        return {
+            "approval": approval,
+            "status": status
+        }
+    
+    def _route_on_error(self, state: WorkflowState) -> str:
+        """
+        Route to the error handler if the previous step failed.
+        
+        Args:
+            state: The current workflow state
             
-            # Update and return the state
-            return {
-                **state,
-                "approval": approval,
-                "status": status
-            }
-        except Exception as e:
-            print(f"Error in _approve_rfp: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {
-                **state,
-                "error": f"Approval error: {str(e)}",
-                "status": "Error during RFP approval"
-            }
+        Returns:
+            str: "error" if an error was recorded, otherwise "ok"
+        """
+        return "error" if state["error"] is not None else "ok"
     
     def _route_after_approval(self, state: WorkflowState) -> str:
         """
@@ -268,18 +360,14 @@ class ProcurementWorkflow:
             state: The current workflow state
             
         Returns:
-            str: The next node to execute
+            str: The next node to execute; a missing approval counts as rejected
         """
-        approval = state.get("approval")
-        
-        # Check if approval is None
-        if approval is None:
-            print("Warning: Approval is None in _route_after_approval")
-            return "rejected"  # Default to rejected if approval is None
-        
-        return "approved" if approval.approved else "rejected"
+        if state["error"] is not None:
+            return "error"
+        approval = state["approval"]
+        return "approved" if approval is not None and approval.approved else "rejected"
     
-    async def _send_email(self, state: WorkflowState) -> WorkflowState:
+    async def _send_email(self, state: WorkflowState) -> Dict[str, Any]:
         """
         Send the approved RFP to suppliers.
         
@@ -287,45 +375,93 @@ class ProcurementWorkflow:
             state: The current workflow state
             
         Returns:
-            WorkflowState: The updated workflow state
+            Dict[str, Any]: The state updates (only the changed keys)
         """
-        try:
-            # Get the RFP from the state
-            rfp = state["rfp"]
-            
-            # Check if suppliers exist
-            if not rfp.suppliers:
-                print("No suppliers specified for RFP. Email will not be sent.")
-                return {
-                    **state,
-                    "email_sent": False,
-                    "status": "No suppliers specified. RFP not sent."
-                }
-            
-            # Send the RFP to suppliers
-            success = await self.approval_agent.send_to_suppliers(rfp)
-            
-            # Update the status message
-            status = "RFP sent to suppliers" if success else "Failed to send RFP to suppliers"
-            
-            # Update and return the state
+        # Get the RFP from the state
+        rfp = state["rfp"]
+        
+        # Check if suppliers exist
+        if not rfp.suppliers:
+            logger.debug("No suppliers specified for RFP %s. Email will not be sent.", rfp.id)
             return {
-                **state,
-                "email_sent": success,
-                "status": status
+                "email_sent": False,
+                "status": "No suppliers specified. RFP not sent."
             }
-        except Exception as e:
-            print(f"Email sending error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        
+        if self.background_email:
+            self._get_outbox().put_nowait(rfp)
+            # The RFP's own status becomes "sent" once the background send succeeds
             return {
-                **state,
-                "error": f"Email sending error: {str(e)}",
-                "status": "Error during email sending",
-                "email_sent": False
+                "email_sent": False,
+                "status": "RFP queued for supplier dispatch"
             }
+        
+        # Send the RFP to suppliers
+        success = await self._send(rfp)
+        
+        # Update the status message
+        status = "RFP sent to suppliers" if success else "Failed to send RFP to suppliers"
+        
+        return {
+            "email_sent": success,
+            "status": status
+        }
     
-    async def _handle_error(self, state: WorkflowState) -> WorkflowState:
+    def _get_outbox(self) -> asyncio.Queue:
+        """
+        Get the background email queue for the running event loop, starting its worker on first use.
+        
+        Returns:
+            asyncio.Queue: The queue of RFPs waiting to be sent
+        """
+        loop = asyncio.get_running_loop()
+        if self._outbox is None or self._outbox_loop is not loop:
+            self._outbox = asyncio.Queue()
+            self._outbox_loop = loop
+            self._outbox_worker = loop.create_task(self._email_worker(self._outbox))
+        return self._outbox
+    
+    async def _email_worker(self, outbox: asyncio.Queue) -> None:
+        """
+        Send queued RFPs to their suppliers, one at a time, for as long as the loop runs.
+        
+        Args:
+            outbox: The queue of RFPs to send
+        """
+        rfp = None
+        try:
+            while True:
+                rfp = await outbox.get()
+                try:
+                    if await self._send(rfp):
+                        logger.info("RFP %s sent to suppliers", rfp.id)
+                    else:
+                        logger.warning("Failed to send RFP %s to suppliers", rfp.id)
+                except Exception:
+                    logger.exception("Error sending RFP %s to suppliers", rfp.id)
+                finally:
+                    outbox.task_done()
+                rfp = None
+        except asyncio.CancelledError:
+            # The loop is shutting down (e.g. asyncio.run returned before wait_for_emails);
+            # whatever is still queued, or was being sent, will not go out
+            unsent = [rfp] if rfp is not None else []
+            while not outbox.empty():
+                unsent.append(outbox.get_nowait())
+                outbox.task_done()
+            if unsent:
+                logger.warning(
+                    "Email worker stopped with %d RFP(s) not sent to suppliers: %s",
+                    len(unsent), ", ".join(str(pending.id) for pending in unsent)
+                )
+            raise
+    
+    async def wait_for_emails(self) -> None:
+        """Wait until every RFP queued for background sending on this event loop has been processed."""
+        if self._outbox is not None and self._outbox_loop is asyncio.get_running_loop():
+            await self._outbox.join()
+    
+    async def _handle_error(self, state: WorkflowState) -> Dict[str, Any]:
         """
         Handle errors in the workflow.
         
@@ -333,51 +469,182 @@ class ProcurementWorkflow:
             state: The current workflow state
             
         Returns:
-            WorkflowState: The updated workflow state
+            Dict[str, Any]: The state updates (only the changed keys)
         """
         # Log the error
-        error = state.get("error", "Unknown error")
-        print(f"Workflow error: {error}")
+        error = state.get("error") or "Unknown error"
+        logger.error("Workflow failed for request %s: %s", state["request"].id, error)
         
         # Update and return the state
         return {
-            **state,
             "status": f"Workflow failed: {error}"
         }
     
-    async def execute(self, request: ProcurementRequest) -> Dict[str, Any]:
-        print(f"==== Starting workflow execution for request: {request.title} ====")
-        print(f"Workflow graph nodes: {[node.value for node in Node]}")
+    @staticmethod
+    def _init_state(
+        request: ProcurementRequest,
+        classification: Optional[ClassificationResult] = None
+    ) -> WorkflowState:
+        """
+        Build the initial workflow state for a request.
+        
+        Args:
+            request: The procurement request to process
+            classification: Optional existing classification to seed the state with
+            
+        Returns:
+            WorkflowState: The initial workflow state
+        """
+        return {**_INITIAL_STATE, "request": request, "classification": classification}
+    
+    @staticmethod
+    def _validate_request(request: ProcurementRequest) -> Optional[str]:
+        """
+        Check that a request has the fields every node relies on.
+        
+        Requests are validated once here, so the nodes can trust their inputs.
+        
+        Args:
+            request: The procurement request to check
+            
+        Returns:
+            Optional[str]: An error message, or None if the request is well-formed
+        """
+        if not request.title.strip() or not request.description.strip():
+            return "Invalid request: a title and description are required"
+        return None
+    
+    async def execute(
+        self,
+        request: ProcurementRequest,
+        classification: Optional[ClassificationResult] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the full procurement workflow for a single request.
+        
+        Args:
+            request: The procurement request to process
+            classification: Optional existing classification; when given, the classification step is skipped
+            
+        Returns:
+            Dict[str, Any]: The final workflow state
+        """
+        logger.info("Starting workflow execution for request: %s", request.title)
         # Initialize the workflow state
-        initial_state: WorkflowState = {
-            "request": request,
-            "classification": None,
-            "rfp": None,
-            "approval": None,
-            "email_sent": False,
-            "error": None,
-            "status": "Started procurement workflow"
-        }
+        initial_state = self._init_state(request, classification)
+        
+        error = self._validate_request(request)
+        if error is not None:
+            logger.warning("Rejected request %s: %s", request.id, error)
+            return {**initial_state, "error": error, "status": "Workflow execution failed"}
         
         # Execute the workflow
         try:
-            # Create a new instance of the workflow
-            print("Compiling workflow...")
-            workflow = self.graph.compile()
-            
             # Run the workflow and get the final state
-            print("Invoking workflow...")
-            final_state = await workflow.ainvoke(initial_state)
-            print("Workflow completed successfully!")
-            print(f"Final state status: {final_state.get('status')}")
+            logger.debug("Invoking workflow")
+            final_state = await self.compiled.ainvoke(initial_state)
+            logger.info("Workflow completed for request %s", request.id)
+            logger.debug("Final state status: %s", final_state.get("status"))
             
             return final_state
         except Exception as e:
-            import traceback
-            print(f"Workflow exception: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Workflow execution failed for request %s", request.id)
             return {
                 **initial_state,
                 "error": f"Workflow execution error: {str(e)}",
                 "status": "Workflow execution failed"
-            }
\ No newline at end of file
+            }
+    
+    async def stream(
+        self,
+        request: ProcurementRequest,
+        classification: Optional[ClassificationResult] = None
+    ) -> AsyncIterator[Dict[str, Dict[str, Any]]]:
+        """
+        Run the workflow for a single request, yielding each node's state update as it finishes.
+        
+        Every event maps the name of the node that just ran to the keys it
+        changed (empty or None if it changed nothing), e.g.
+        ``{"classify": {"classification": ..., "status": ...}}``,
+        so a caller can report progress or act on the classification before
+        the RFP is generated. Merging the updates in order on top of the
+        initial state gives the same final state ``execute`` returns.
+        
+        Args:
+            request: The procurement request to process
+            classification: Optional existing classification; when given, the classification step is skipped
+            
+        Yields:
+            Dict[str, Dict[str, Any]]: The state update of each node, keyed by node name
+        """
+        error = self._validate_request(request)
+        if error is not None:
+            logger.warning("Rejected request %s: %s", request.id, error)
+            yield {Node.ERROR_HANDLER: {"error": error, "status": "Workflow execution failed"}}
+            return
+        
+        try:
+            async for event in self.compiled.astream(
+                self._init_state(request, classification), stream_mode="updates"
+            ):
+                yield event
+        except Exception as e:
+            logger.exception("Workflow execution failed for request %s", request.id)
+            yield {Node.ERROR_HANDLER: {
+                "error": f"Workflow execution error: {str(e)}",
+                "status": "Workflow execution failed"
+            }}
+    
+    async def execute_batch(
+        self,
+        requests: List[ProcurementRequest],
+        max_concurrent: int = MAX_CONCURRENT_LLM_CALLS
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the workflow for many requests concurrently, classifying them together in combined prompts.
+        
+        Classification is done up front with one LLM call per batch of requests
+        instead of one per request. Every request then runs through
+        the compiled graph concurrently, so the generation and approval
+        round-trips of different requests overlap.
+        
+        Args:
+            requests: The procurement requests to process
+            max_concurrent: Maximum number of workflows running at once
+            
+        Returns:
+            List[Dict[str, Any]]: The final workflow state for each request, in input order
+        """
+        # Only well-formed requests are sent for combined classification
+        errors = [self._validate_request(request) for request in requests]
+        valid = [request for request, error in zip(requests, errors) if error is None]
+        try:
+            classified = await self.classification_agent.classify_combined(valid)
+        except Exception:
+            logger.exception("Combined classification failed, classifying requests individually")
+            classified = [None] * len(valid)
+        classified = iter(classified)
+        classifications = [next(classified) if error is None else None for error in errors]
+        
+        ainvoke = self.compiled.ainvoke
+        
+        async def run(item: Tuple[WorkflowState, Optional[str]]) -> Dict[str, Any]:
+            initial_state, error = item
+            if error is not None:
+                logger.warning("Rejected request %s: %s", initial_state["request"].id, error)
+                return {**initial_state, "error": error, "status": "Workflow execution failed"}
+            try:
+                return await ainvoke(initial_state)
+            except Exception as e:
+                logger.exception("Workflow execution failed for request %s", initial_state["request"].id)
+                return {
+                    **initial_state,
+                    "error": f"Workflow execution error: {str(e)}",
+                    "status": "Workflow execution failed"
+                }
+        
+        initial_states = [
+            self._init_state(request, classification)
+            for request, classification in zip(requests, classifications)
+        ]
+        return await gather_bounded(run, zip(initial_states, errors), max_concurrent)